@@ -0,0 +1,158 @@
+"""
+    Adjacency - legal moves of every tile in one packed table
+    Tiles are flat indices i = y * width + x. legal[i] is a 4-bit mask,
+    bit d set when moving in direction d (0 north, 1 east, 2 south,
+    3 west) from tile i stays inside the room and does not run into a
+    blocked tile; the neighbour is i + offsets[d]. block() updates the
+    table in place when an obstacle is discovered, so a neighbour query
+    is one bytearray lookup however the obstacle was found.
+
+    Room keeps one for the Simulator's move check; controllers build
+    their own from what they know about the room.
+"""
+
+import numpy as np
+
+from Grid import BLOCK
+
+# (dx, dy) for directions north, east, south, west
+DIRECTIONS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+# directions ordered by the neighbour tile they lead to:
+# west < north < south < east as (x, y) tuples
+NEIGHBOUR_ORDER = (3, 0, 2, 1)
+# legal mask -> its directions in NEIGHBOUR_ORDER
+ORDERED = tuple(
+    tuple(d for d in NEIGHBOUR_ORDER if mask >> d & 1) for mask in range(16)
+)
+# direction pointing back
+OPPOSITE = (2, 3, 0, 1)
+
+
+class Adjacency:
+    def __init__(self, width, height, blocked=None):
+        """
+        blocked: optional boolean (height, width) array of blocked tiles
+        """
+        self.width = width
+        self.height = height
+        self.offsets = (-width, 1, width, -1)
+
+        free = np.ones((height, width), dtype=bool)
+        if blocked is not None:
+            free &= ~np.asarray(blocked, dtype=bool)
+        # inside: the direction stays in the room; legal: and the
+        # neighbour is free
+        inside = np.zeros((height, width), dtype=np.uint8)
+        legal = np.zeros((height, width), dtype=np.uint8)
+        free_bits = free.astype(np.uint8)
+        inside[1:, :] |= 1
+        legal[1:, :] |= free_bits[:-1, :]
+        inside[:, :-1] |= 2
+        legal[:, :-1] |= free_bits[:, 1:] << 1
+        inside[:-1, :] |= 4
+        legal[:-1, :] |= free_bits[1:, :] << 2
+        inside[:, 1:] |= 8
+        legal[:, 1:] |= free_bits[:, :-1] << 3
+        self.inside = inside.tobytes()
+        self.legal = bytearray(legal.tobytes())
+        self.blocked = bytearray((~free).tobytes())
+
+        # position -> (neighbour, direction, neighbour index) of its legal
+        # moves in NEIGHBOUR_ORDER; filled on first use, dropped by block()
+        self.moves_cache = {}
+
+    @classmethod
+    def from_grid(cls, grid, flag=BLOCK):
+        return cls(grid.width, grid.height, grid.mask(flag))
+
+    def index(self, pos):
+        return pos[1] * self.width + pos[0]
+
+    def position(self, i):
+        y, x = divmod(i, self.width)
+        return (x, y)
+
+    def in_bounds(self, pos):
+        x, y = pos
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_legal(self, pos, direction):
+        return self.legal[pos[1] * self.width + pos[0]] >> direction & 1
+
+    def is_open(self, pos):
+        # inside the room and not blocked
+        x, y = pos
+        return (0 <= x < self.width and 0 <= y < self.height
+                and not self.blocked[y * self.width + x])
+
+    def leaves_room(self, pos, direction):
+        return not self.inside[pos[1] * self.width + pos[0]] >> direction & 1
+
+    def block(self, pos):
+        """
+        Marks a tile blocked and clears every move into it;
+        returns True if it was not blocked before
+        """
+        if not self.in_bounds(pos):
+            return False
+        i = pos[1] * self.width + pos[0]
+        if self.blocked[i]:
+            return False
+        self.blocked[i] = 1
+        x, y = pos
+        for d, (dx, dy) in enumerate(DIRECTIONS):
+            if self.inside[i] >> d & 1:
+                j = i + self.offsets[d]
+                self.legal[j] &= ~(1 << OPPOSITE[d])
+                self.moves_cache.pop((x + dx, y + dy), None)
+        return True
+
+    def moves(self, pos):
+        """
+        Returns TUPLE of (neighbour, direction, neighbour index) for
+        every legal move from pos, smallest neighbour first
+        """
+        moves = self.moves_cache.get(pos)
+        if moves is None:
+            x, y = pos
+            i = y * self.width + x
+            moves = self.moves_cache[pos] = tuple(
+                ((x + DIRECTIONS[d][0], y + DIRECTIONS[d][1]), d, i + self.offsets[d])
+                for d in ORDERED[self.legal[i]]
+            )
+        return moves
+
+    def distances(self, target):
+        """
+        BFS distance (in moves) from every tile to target around blocked
+        tiles; LIST indexed by flat tile index, -1 where unreachable
+        """
+        n = self.width * self.height
+        distances = [-1] * n
+        if not self.is_open(target):
+            return distances
+        legal = self.legal
+        north, east, south, west = self.offsets
+        start = target[1] * self.width + target[0]
+        distances[start] = 0
+        frontier = [start]
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for i in frontier:
+                mask = legal[i]
+                if mask & 1 and distances[i + north] < 0:
+                    distances[i + north] = distance
+                    next_frontier.append(i + north)
+                if mask & 2 and distances[i + east] < 0:
+                    distances[i + east] = distance
+                    next_frontier.append(i + east)
+                if mask & 4 and distances[i + south] < 0:
+                    distances[i + south] = distance
+                    next_frontier.append(i + south)
+                if mask & 8 and distances[i + west] < 0:
+                    distances[i + west] = distance
+                    next_frontier.append(i + west)
+            frontier = next_frontier
+        return distances
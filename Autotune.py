@@ -0,0 +1,210 @@
+"""
+    Autotune - search controller tuning constants over seeded episodes
+    Successive halving per level: a random sample of configurations (plus
+    the defaults) each plays a few episodes, the best 1/eta go on to play
+    eta times as many, until one is left. All configurations play the
+    same seeds (see Tournament.episode_rngs), so they are compared on the
+    same rooms and agent decisions, and episodes run in a process pool.
+
+    The winner and the defaults are then played on fresh seeds, and
+    both efficiencies are reported with 95% confidence intervals, along
+    with the paired difference between them.
+
+    RoboVac1's thresholds steer its legacy seek mode and loop avoider;
+    geodesic seek never waits for them, so they are tuned with
+    geodesic_seek=False unless --param says otherwise.
+
+    usage: python Autotune.py --levels 5
+           python Autotune.py --levels 0-5 --configs 81 --episodes 4 --final 200
+"""
+
+import argparse
+import itertools
+import math
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from Tournament import parse_levels, parse_param, run_episode
+
+# RoboVac1 tuning constants and the values searched
+SPACE = {
+    "seek_threshold": range(2, 17),
+    "loop_threshold": range(2, 9),
+    "escape_run": range(1, 7),
+}
+DEFAULTS = {"seek_threshold": 8, "loop_threshold": 4, "escape_run": 3}
+# keyword arguments passed to every configuration
+FIXED = {"geodesic_seek": False}
+
+# normal quantile for 95% confidence intervals
+Z95 = 1.96
+
+
+def sample_configs(space, count, rng, defaults=None):
+    """
+    Returns LIST of count distinct configurations (tuples of
+    (name, value) pairs), the defaults first when given
+    """
+    names = sorted(space)
+    grid_size = math.prod(len(space[name]) for name in names)
+    configs = [tuple(sorted(defaults.items()))] if defaults else []
+    if count >= grid_size:
+        candidates = [
+            tuple(zip(names, values))
+            for values in itertools.product(*(space[name] for name in names))
+        ]
+        return configs + [c for c in candidates if c not in configs]
+    while len(configs) < count:
+        config = tuple((name, rng.choice(space[name])) for name in names)
+        if config not in configs:
+            configs.append(config)
+    return configs
+
+
+def confidence_interval(samples):
+    """
+    Returns (mean, half width of the 95% confidence interval)
+    """
+    mean = statistics.fmean(samples)
+    if len(samples) < 2:
+        return mean, float("inf")
+    return mean, Z95 * statistics.stdev(samples) / math.sqrt(len(samples))
+
+
+def format_config(config):
+    return " ".join(f"{name}={value}" for name, value in config)
+
+
+class Tuner:
+    def __init__(self, controller="RoboVac1", max_cycles=400, room_spec=None,
+                 workers=None, fixed=None):
+        """
+        fixed: DICT of keyword arguments every configuration is played with
+        """
+        self.controller = controller
+        self.fixed = dict(FIXED if fixed is None else fixed)
+        self.max_cycles = max_cycles
+        self.room_spec = room_spec
+        self.pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.pool.shutdown()
+
+    def play(self, configs, level, seeds):
+        """
+        Plays every configuration on every seed
+        Returns DICT {config: LIST of efficiencies in seed order}
+        """
+        futures = {
+            config: [
+                self.pool.submit(run_episode, self.controller, level, seed,
+                                 self.max_cycles, self.room_spec,
+                                 params={**self.fixed, **dict(config)})
+                for seed in seeds
+            ]
+            for config in configs
+        }
+        return {
+            config: [future.result()["efficiency"] for future in config_futures]
+            for config, config_futures in futures.items()
+        }
+
+    def successive_halving(self, configs, level, episodes=4, eta=3, seed=0,
+                           report=None):
+        """
+        Returns (best config, DICT {config: efficiencies}); config i plays
+        seeds seed, seed + 1, ... so every round only adds new episodes
+        report: optional callable told (round, configs left, episodes,
+                best mean) after every round
+        """
+        scores = {config: [] for config in configs}
+        alive = list(configs)
+        budget = episodes
+        for round_number in itertools.count():
+            played = len(scores[alive[0]])
+            new = self.play(alive, level, range(seed + played, seed + budget))
+            for config, efficiencies in new.items():
+                scores[config].extend(efficiencies)
+            # ties keep the earlier config (the defaults come first)
+            alive.sort(key=lambda config: -statistics.fmean(scores[config]))
+            if report:
+                report(round_number, len(alive), budget,
+                       statistics.fmean(scores[alive[0]]))
+            if len(alive) > 1:
+                alive = alive[:max(1, len(alive) // eta)]
+            if len(alive) == 1:
+                break
+            budget *= eta
+        return alive[0], scores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("--controller", default="RoboVac1",
+                        help="controller module or .py file taking the SPACE "
+                             "keyword arguments (default RoboVac1)")
+    parser.add_argument("--levels", type=parse_levels, default=[5],
+                        help="levels to tune, e.g. 0-5 or 3,5 (default 5)")
+    parser.add_argument("--room", metavar="SPEC",
+                        help="generated rooms, e.g. random:40x40:0.2")
+    parser.add_argument("--configs", type=int, default=27,
+                        help="configurations sampled per level (default 27)")
+    parser.add_argument("--episodes", type=int, default=4,
+                        help="episodes per configuration in the first round")
+    parser.add_argument("--eta", type=int, default=3,
+                        help="keep the best 1/eta each round (default 3)")
+    parser.add_argument("--final", type=int, default=100,
+                        help="fresh episodes to compare winner and defaults on")
+    parser.add_argument("--seed", type=int, default=0, help="first episode seed")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: cpu count)")
+    parser.add_argument("--max-cycles", type=int, default=400)
+    parser.add_argument("--param", type=parse_param, action="append", default=[],
+                        metavar="NAME=VALUE",
+                        help="fixed controller keyword argument "
+                             f"(default {format_config(FIXED.items())})")
+    args = parser.parse_args(argv)
+    fixed = {**FIXED, **dict(args.param)}
+
+    rng = random.Random(args.seed)
+    defaults = tuple(sorted(DEFAULTS.items()))
+    start = time.perf_counter()
+    print(f"fixed: {format_config(fixed.items())}")
+    with Tuner(args.controller, args.max_cycles, args.room, args.workers,
+               fixed) as tuner:
+        for level in args.levels:
+            print(f"Level {level}")
+            configs = sample_configs(SPACE, args.configs, rng, DEFAULTS)
+
+            def report(round_number, alive, episodes, best):
+                print(f"  round {round_number}: {alive:>3} configs x "
+                      f"{episodes:>4} episodes, best eff {best:.3f}")
+
+            best, scores = tuner.successive_halving(
+                configs, level, args.episodes, args.eta, args.seed, report
+            )
+            # fresh seeds: the halving scores favour the lucky
+            final_seed = args.seed + len(scores[best])
+            final = tuner.play([best, defaults], level,
+                               range(final_seed, final_seed + args.final))
+            mean, half = confidence_interval(final[best])
+            default_mean, default_half = confidence_interval(final[defaults])
+            gain, gain_half = confidence_interval(
+                [a - b for a, b in zip(final[best], final[defaults])]
+            )
+            print(f"  best:     {format_config(best)}")
+            print(f"            eff {mean:.3f} +/- {half:.3f} "
+                  f"over {args.final} fresh episodes")
+            print(f"  defaults: eff {default_mean:.3f} +/- {default_half:.3f}")
+            print(f"  gain:     {gain:+.3f} +/- {gain_half:.3f} (paired)")
+    print(f"{time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
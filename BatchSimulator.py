@@ -0,0 +1,169 @@
+"""
+    BatchSimulator - step many independent episodes in lockstep
+    Positions, walls, furniture and coverage for a whole batch of rooms are
+    stacked into numpy arrays, so move legality, position updates and
+    coverage accounting are a handful of array operations per tick no
+    matter how many episodes are running. Same rules as Simulator.
+
+    A policy maps the batch to one direction per episode. Vectorised
+    policies (random_policy, greedy_policy) keep the whole tick in numpy;
+    agent_policy wraps ordinary RoboVac objects for comparison runs.
+    needs numpy
+"""
+
+import numpy as np
+
+from Grid import BLOCK
+
+# tile values
+FREE = 0
+FURNITURE = 1
+WALL = 2
+
+# (dx, dy) for directions north, east, south, west
+DELTAS = np.array([(0, -1), (1, 0), (0, 1), (-1, 0)], dtype=np.int64)
+
+
+class BatchSimulator:
+    def __init__(self, rooms, max_cycles=400):
+        self.rooms = rooms
+        self.max_cycles = max_cycles
+        batch = len(rooms)
+        width = max(room.max_width for room in rooms)
+        height = max(room.max_height for room in rooms)
+
+        # tiles[b, y + 1, x + 1]: one tile of padding all round is wall,
+        # as is everything outside a room smaller than the largest one
+        self.tiles = np.full((batch, height + 2, width + 2), WALL, dtype=np.uint8)
+        for b, room in enumerate(rooms):
+            self.tiles[b, 1:room.max_height + 1, 1:room.max_width + 1] = np.where(
+                room.grid.mask(BLOCK), FURNITURE, FREE
+            )
+        self.clean = np.zeros(self.tiles.shape, dtype=bool)
+
+        self.batch_index = np.arange(batch)
+        # positions in padded coordinates, columns x, y
+        self.pos = np.array([room.vac_pos for room in rooms], dtype=np.int64) + 1
+        self.clean[self.batch_index, self.pos[:, 1], self.pos[:, 0]] = True
+
+        self.clean_count = np.ones(batch, dtype=np.int64)
+        self.max_tiles = np.array([room.max_tiles for room in rooms], dtype=np.int64)
+        # starts at 5 like Simulator / PygameRoboVac.main()
+        self.move_count = np.full(batch, 5, dtype=np.int64)
+        self.wall_bumps = np.zeros(batch, dtype=np.int64)
+        self.furniture_bumps = np.zeros(batch, dtype=np.int64)
+        self.done = np.zeros(batch, dtype=bool)
+        self.update_done()
+
+    def update_done(self):
+        self.done |= (self.clean_count == self.max_tiles) | (
+            self.move_count > self.max_cycles
+        )
+
+    def positions(self):
+        # (batch, 2) array of x, y room coordinates
+        return self.pos - 1
+
+    def step(self, dirs):
+        """
+        Applies one direction per episode; finished episodes stand still.
+        Returns the (batch,) array of tile values that were hit
+        (FREE when the move went through)
+        """
+        active = ~self.done
+        dirs = np.asarray(dirs)
+        # a direction other than 0-3 is a wall bump, as in Simulator.move
+        valid = (dirs >= 0) & (dirs <= 3)
+        step = DELTAS[np.where(valid, dirs, 0)] * (active & valid)[:, None]
+        target = self.pos + step
+        hit = np.where(
+            valid, self.tiles[self.batch_index, target[:, 1], target[:, 0]], WALL
+        )
+        moved = active & (hit == FREE)
+
+        self.pos[moved] = target[moved]
+        x, y = self.pos[:, 0], self.pos[:, 1]
+        self.clean_count += moved & ~self.clean[self.batch_index, y, x]
+        self.clean[self.batch_index[moved], y[moved], x[moved]] = True
+
+        self.move_count += active
+        self.wall_bumps += active & (hit == WALL)
+        self.furniture_bumps += active & (hit == FURNITURE)
+        self.update_done()
+        return np.where(active, hit, FREE)
+
+    def run(self, policy):
+        # one python loop iteration per tick for the whole batch
+        while not self.done.all():
+            self.step(policy(self))
+        return self.results()
+
+    def results(self):
+        """
+        Returns LIST with one Simulator.results()-style DICT per episode
+        """
+        results = []
+        for b, room in enumerate(self.rooms):
+            clean_count = int(self.clean_count[b])
+            move_count = int(self.move_count[b])
+            results.append(
+                {
+                    "success": clean_count == room.max_tiles,
+                    "level": room.game_level,
+                    "coverage": clean_count / room.max_tiles,
+                    "cycles": move_count,
+                    "tiles_cleaned": clean_count,
+                    "max_tiles": room.max_tiles,
+                    "efficiency": room.max_tiles / move_count,
+                    "width": room.max_width,
+                    "height": room.max_height,
+                    "wall_bumps": int(self.wall_bumps[b]),
+                    "furniture_bumps": int(self.furniture_bumps[b]),
+                }
+            )
+        return results
+
+
+# Policies ------
+def random_policy(rng):
+    # uniformly random direction per episode; rng is a numpy Generator
+    def policy(sim):
+        return rng.integers(0, 4, size=len(sim.rooms))
+
+    return policy
+
+
+def greedy_policy(rng):
+    """
+    Moves to a neighbouring free tile that is not clean yet when there is
+    one, otherwise to a random free neighbour; fully vectorised
+    """
+
+    def policy(sim):
+        # neighbour tiles (batch, 4)
+        nx = sim.pos[:, 0:1] + DELTAS[:, 0]
+        ny = sim.pos[:, 1:2] + DELTAS[:, 1]
+        b = sim.batch_index[:, None]
+        free = sim.tiles[b, ny, nx] == FREE
+        dirty = free & ~sim.clean[b, ny, nx]
+        # dirty beats free beats blocked; random noise breaks ties
+        score = dirty * 2.0 + free + rng.random(free.shape)
+        return score.argmax(axis=1)
+
+    return policy
+
+
+def agent_policy(agents):
+    """
+    Asks one RoboVac-style agent per episode for its move
+    (a python call per episode, so mainly for checking against Simulator)
+    """
+
+    def policy(sim):
+        dirs = np.zeros(len(agents), dtype=np.int64)
+        for b in np.flatnonzero(~sim.done):
+            x, y = sim.pos[b] - 1
+            dirs[b] = agents[b].get_next_move((int(x), int(y)))
+        return dirs
+
+    return policy
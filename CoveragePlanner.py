@@ -0,0 +1,257 @@
+"""
+    CoveragePlanner - full coverage route for a known room
+    Splits the free tiles into boustrophedon cells (column sweep; a new cell
+    starts wherever a column's free segments split or merge around
+    furniture), then tours the cells greedily: from the current position go
+    to the nearest uncovered cell corner and sweep that cell column by
+    column in a back-and-forth (ox plow) pattern. Gaps between consecutive
+    sweep tiles are bridged with BFS shortest paths over the room's
+    Adjacency table.
+
+    The route is returned as a list of directions
+    0 = north, 1 = east, 2 = south, 3 = west  (same as RoboVac.get_next_move)
+"""
+
+from collections import deque
+
+import numpy as np
+
+from Adjacency import DIRECTIONS, Adjacency
+from Grid import BLOCK, Grid
+
+
+def column_segments(column):
+    # maximal runs of free tiles in a column of blocked flags as (y_top, y_bottom)
+    edges = np.flatnonzero(np.diff(np.concatenate(([1], column, [1])).astype(np.int8)))
+    return [(int(top), int(bottom) - 1) for top, bottom in zip(edges[::2], edges[1::2])]
+
+
+def decompose(blocked):
+    """
+    Boustrophedon cell decomposition of a (height, width) array of
+    blocked tiles
+    Returns LIST of cells; each cell is a list of (x, y_top, y_bottom)
+    column slices with consecutive x values
+    """
+    cells = []
+    previous = []  # (y_top, y_bottom, cell index) in previous column
+    for x in range(blocked.shape[1]):
+        segments = column_segments(blocked[:, x])
+        current = []
+        for top, bottom in segments:
+            cell = None
+            overlaps = [p for p in previous if p[0] <= bottom and top <= p[1]]
+            if len(overlaps) == 1:
+                p_top, p_bottom, p_cell = overlaps[0]
+                # continue the cell only if nothing splits or merges here
+                if [s for s in segments if s[0] <= p_bottom and p_top <= s[1]] == [
+                    (top, bottom)
+                ]:
+                    cell = p_cell
+            if cell is None:
+                cells.append([])
+                cell = len(cells) - 1
+            cells[cell].append((x, top, bottom))
+            current.append((top, bottom, cell))
+        previous = current
+    return cells
+
+
+def sweep(cell, from_left, from_top):
+    # tiles of a cell in back-and-forth column order
+    slices = cell if from_left else cell[::-1]
+    tiles = []
+    down = from_top
+    last_y = None
+    for x, top, bottom in slices:
+        if last_y is not None:
+            # start each column at the end closest to where the last one ended
+            down = abs(last_y - top) <= abs(last_y - bottom)
+        ys = range(top, bottom + 1) if down else range(bottom, top - 1, -1)
+        tiles.extend((x, y) for y in ys)
+        last_y = tiles[-1][1]
+    return tiles
+
+
+class PathFinder:
+    """
+    Breadth first searches over an Adjacency; the per tile scratch
+    arrays are shared by all searches, so a search only costs the tiles
+    it reaches
+    """
+
+    def __init__(self, adjacency):
+        self.adjacency = adjacency
+        size = adjacency.width * adjacency.height
+        self.seen = [0] * size  # number of the last search that reached the tile
+        self.came = bytearray(size)  # direction the tile was reached by
+        self.searches = 0
+
+    def bfs_path(self, start, is_goal, goals=None):
+        """
+        Shortest path from tile start (flat index) to the first tile i
+        where is_goal(i) is True; goals: optional flags, is_goal is only
+        asked about tiles whose flag is set
+        Returns (goal tile, list of directions) or (None, None)
+        """
+        self.searches += 1
+        search = self.searches
+        seen = self.seen
+        came = self.came
+        legal = self.adjacency.legal
+        offsets = self.adjacency.offsets
+        north, east, south, west = offsets
+        seen[start] = search
+        frontier = deque([start])
+        popleft = frontier.popleft
+        append = frontier.append
+        while frontier:
+            i = popleft()
+            if (goals is None or goals[i]) and is_goal(i):
+                goal = i
+                moves = []
+                while i != start:
+                    direction = came[i]
+                    moves.append(direction)
+                    i -= offsets[direction]
+                moves.reverse()
+                return goal, moves
+            # neighbours in direction order, as the route depends on it
+            mask = legal[i]
+            if mask & 1 and seen[i + north] != search:
+                seen[i + north] = search
+                came[i + north] = 0
+                append(i + north)
+            if mask & 2 and seen[i + east] != search:
+                seen[i + east] = search
+                came[i + east] = 1
+                append(i + east)
+            if mask & 4 and seen[i + south] != search:
+                seen[i + south] = search
+                came[i + south] = 2
+                append(i + south)
+            if mask & 8 and seen[i + west] != search:
+                seen[i + west] = search
+                came[i + west] = 3
+                append(i + west)
+        return None, None
+
+
+def plan_coverage(
+    room_width, room_height, block_list, start, first_entries=8, max_retry_tiles=4096
+):
+    """
+    Returns LIST of directions that visits every free tile reachable
+    from start
+    Tries both sweep orientations (columns, and rows via the transposed
+    room) and the first_entries nearest cells to start with, and keeps
+    the shortest route. Rooms larger than max_retry_tiles are planned
+    once, column sweep only.
+    """
+    grid = Grid(room_width, room_height)
+    grid.add_rects(block_list, BLOCK)
+    blocked = grid.mask(BLOCK)
+    orientations = (False, True)
+    if room_width * room_height > max_retry_tiles:
+        orientations = (False,)
+        first_entries = 1
+    best = None
+    for transpose in orientations:
+        if transpose:
+            # sweep rows: plan in the mirrored room, then swap N/W and E/S
+            room_blocked = blocked.T
+            room_start = (start[1], start[0])
+        else:
+            room_blocked = blocked
+            room_start = tuple(start)
+        height, width = room_blocked.shape
+        adjacency = Adjacency(width, height, room_blocked)
+        cells = decompose(room_blocked)
+        for first in range(first_entries):
+            route = tour_cells(cells, adjacency, room_start, first)
+            if route is None:
+                break  # fewer than first + 1 cells to start with
+            if transpose:
+                route = [3 - direction for direction in route]
+            if best is None or len(route) < len(best):
+                best = route
+    return best
+
+
+def tour_cells(cells, adjacency, start, first=0):
+    """
+    Greedy tour: repeatedly go to the nearest corner of a cell that is not
+    swept yet and sweep it. For the first cell the first-th nearest one
+    is used instead. Returns LIST of directions (None if there is no
+    first-th cell)
+    """
+    width = adjacency.width
+    offsets = adjacency.offsets
+    paths = PathFinder(adjacency)
+
+    # corner tiles a cell can be entered from:
+    # tile index -> [(cell, from_left, from_top)]
+    entries = {}
+    for index, cell in enumerate(cells):
+        first_slice, last_slice = cell[0], cell[-1]
+        for from_left, (x, top, bottom) in ((True, first_slice), (False, last_slice)):
+            entries.setdefault(top * width + x, []).append((index, from_left, True))
+            entries.setdefault(bottom * width + x, []).append((index, from_left, False))
+    corners = bytearray(width * adjacency.height)
+    for i in entries:
+        corners[i] = 1
+
+    route = []
+    pos = adjacency.index(start)
+    visited = bytearray(len(corners))
+    visited[pos] = 1
+    remaining = set(range(len(cells)))
+
+    def walk(moves):
+        # follow moves from pos, marking tiles visited
+        nonlocal pos
+        i = pos
+        for direction in moves:
+            i += offsets[direction]
+            visited[i] = 1
+        route.extend(moves)
+        pos = i
+
+    skip = first
+    while remaining:
+        # nearest corner of a cell that is not swept yet
+        seen = set()
+
+        def is_entry(tile):
+            nonlocal skip
+            for e in entries[tile]:
+                if e[0] in remaining and e[0] not in seen:
+                    if not skip:
+                        return True
+                    seen.add(e[0])
+                    skip -= 1
+            return False
+
+        entry, moves = paths.bfs_path(pos, is_entry, corners)
+        if entry is None:
+            if first and len(remaining) == len(cells):
+                return None
+            break  # the rest is cut off from here
+        walk(moves)
+        index, from_left, from_top = next(
+            e for e in entries[entry] if e[0] in remaining and e[0] not in seen
+        )
+        remaining.discard(index)
+
+        for x, y in sweep(cells[index], from_left, from_top):
+            tile = y * width + x
+            if visited[tile]:
+                continue
+            px, py = pos % width, pos // width
+            if abs(x - px) + abs(y - py) == 1:
+                walk([DIRECTIONS.index((x - px, y - py))])
+            else:
+                goal, moves = paths.bfs_path(pos, tile.__eq__)
+                if goal is not None:
+                    walk(moves)
+    return route
@@ -0,0 +1,106 @@
+"""
+    EventLog - leveled diagnostic events instead of print()
+    Controllers and the game loop emit typed events (a kind plus its
+    arguments) instead of printing. Events below the log level are
+    dropped at the cost of one comparison, and nothing is formatted until
+    a sink asks for the text. Kept events go into a ring buffer holding
+    the most recent ones and are passed to any attached sinks.
+
+    The default log is off; set ROBOVAC_LOG=debug (or info) or call
+    default_log().enable(DEBUG, print_sink) to see them.
+"""
+
+import os
+import sys
+from collections import deque, namedtuple
+
+# levels, as in the logging module
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+
+LEVEL_NAMES = {"debug": DEBUG, "info": INFO, "warning": WARNING, "off": OFF}
+
+# event kinds and how they read as text
+CONFIG_BLOCK = "config_block"  # block from the room config: (x, y, width, height)
+SEEK_TARGET = "seek_target"  # seek mode target: pos
+OBSTACLE = "obstacle"  # obstacle discovered by bumping into it: pos
+LOOP_DIRECTION = "loop_direction"  # loop avoider direction: dir
+LOOP_ACTIVATED = "loop_activated"  # loop avoider took over
+RANDOM_MOVE = "random_move"  # main random fallback
+BLOCKED = "blocked"  # move blocked: dir, WALL or FURNITURE
+MOVE_COUNT = "move_count"  # progress: move count
+
+FORMATS = {
+    CONFIG_BLOCK: "{0}",
+    SEEK_TARGET: "seeking {0}",
+    OBSTACLE: "added obstacle {0}",
+    LOOP_DIRECTION: "loop avoider direction: {0}",
+    LOOP_ACTIVATED: "loop avoider activated",
+    RANDOM_MOVE: "main random",
+    BLOCKED: "dir={0} BLOCKED: {1}",
+    MOVE_COUNT: "Move Count: {0}",
+}
+
+
+class Event(namedtuple("Event", "level kind args")):
+    __slots__ = ()
+
+    def __str__(self):
+        return FORMATS.get(self.kind, self.kind + " {0}").format(*self.args)
+
+
+def print_sink(event, file=None):
+    # writes the event text like the old print() calls did
+    print(event, file=file or sys.stdout)
+
+
+class EventLog:
+    def __init__(self, level=OFF, capacity=1024):
+        self.level = level
+        self.buffer = deque(maxlen=capacity)  # most recent events
+        self.sinks = []
+
+    def emit(self, level, kind, *args):
+        if level < self.level:
+            return
+        event = Event(level, kind, args)
+        self.buffer.append(event)
+        for sink in self.sinks:
+            sink(event)
+
+    def enable(self, level=DEBUG, sink=None):
+        self.level = level
+        if sink is not None and sink not in self.sinks:
+            self.sinks.append(sink)
+
+    def disable(self):
+        self.level = OFF
+        self.sinks.clear()
+
+    def recent(self, kind=None):
+        """
+        Returns LIST of buffered events, oldest first (only kind if given)
+        """
+        return [e for e in self.buffer if kind is None or e.kind == kind]
+
+    def clear(self):
+        self.buffer.clear()
+
+
+_default_log = None
+
+
+def default_log():
+    """
+    The process wide EventLog; ROBOVAC_LOG=debug|info|warning turns it on
+    with a stdout sink
+    """
+    global _default_log
+    if _default_log is None:
+        _default_log = EventLog()
+        level = LEVEL_NAMES.get(os.environ.get("ROBOVAC_LOG", "off").lower(), OFF)
+        if level < OFF:
+            _default_log.enable(level, print_sink)
+    return _default_log
@@ -0,0 +1,108 @@
+"""
+    Grid - compact tile state for a room
+    One uint8 per tile holding bit flags (BLOCK, CLEAN) in a numpy array
+    of shape (height, width). Blocks are rasterised with slice assignment
+    and counts are array operations; single tiles are read and written
+    through a flat memoryview, which is as fast as a set lookup.
+    needs numpy
+"""
+
+import numpy as np
+
+# tile flags
+BLOCK = 1  # furniture / known obstacle
+CLEAN = 2  # visited by the vacuum
+
+
+class Grid:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = np.zeros((height, width), dtype=np.uint8)
+        # flat view of cells: tile (x, y) is flat[y * width + x]
+        self.flat = memoryview(self.cells.reshape(-1))
+
+    # the memoryview can't be pickled or copied; rebuild it from cells
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["flat"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.flat = memoryview(self.cells.reshape(-1))
+
+    def in_bounds(self, pos):
+        x, y = pos
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def add_rect(self, rect, flag):
+        # set flag on every tile of an (x, y, width, height) rect
+        x, y, width, height = rect
+        self.cells[max(y, 0):max(y + height, 0), max(x, 0):max(x + width, 0)] |= flag
+
+    def add_rects(self, rects, flag):
+        if len(rects) < 32:
+            for rect in rects:
+                self.add_rect(rect, flag)
+            return
+        # many rects: 2D difference array, then prefix sums
+        r = np.asarray(rects, dtype=np.int64).reshape(-1, 4)
+        x0 = np.clip(r[:, 0], 0, self.width)
+        y0 = np.clip(r[:, 1], 0, self.height)
+        x1 = np.clip(r[:, 0] + r[:, 2], 0, self.width)
+        y1 = np.clip(r[:, 1] + r[:, 3], 0, self.height)
+        diff = np.zeros((self.height + 1, self.width + 1), dtype=np.int32)
+        np.add.at(diff, (y0, x0), 1)
+        np.add.at(diff, (y0, x1), -1)
+        np.add.at(diff, (y1, x0), -1)
+        np.add.at(diff, (y1, x1), 1)
+        covered = diff.cumsum(axis=0).cumsum(axis=1)[:-1, :-1] > 0
+        self.cells[covered] |= flag
+
+    def set(self, pos, flag):
+        """
+        Sets flag on a tile; returns True if it was not set before
+        """
+        i = pos[1] * self.width + pos[0]
+        value = self.flat[i]
+        if value & flag:
+            return False
+        self.flat[i] = value | flag
+        return True
+
+    def is_set(self, pos, flag):
+        # tiles outside the grid have no flags
+        x, y = pos
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return bool(self.flat[y * self.width + x] & flag)
+        return False
+
+    def count(self, flag):
+        return int(np.count_nonzero(self.cells & flag))
+
+    def mask(self, flag):
+        # boolean (height, width) array of tiles with flag set
+        return (self.cells & flag).astype(bool)
+
+    def positions(self, flag, value=True):
+        """
+        Returns SET of (x, y) tuples with flag set
+        (or not set, when value is False)
+        """
+        mask = self.mask(flag)
+        if not value:
+            mask = ~mask
+        ys, xs = np.nonzero(mask)
+        return set(zip(xs.tolist(), ys.tolist()))
+
+    def row_bits(self, flag, value=True):
+        """
+        Returns LIST with one int per row; bit x is set when tile (x, y)
+        has flag set (or not set, when value is False)
+        """
+        mask = self.mask(flag)
+        if not value:
+            mask = ~mask
+        packed = np.packbits(mask, axis=1, bitorder="little")
+        return [int.from_bytes(row.tobytes(), "little") for row in packed]
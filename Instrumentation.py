@@ -0,0 +1,95 @@
+"""
+    Instrumentation - per-move counters for the game loop
+    Pass MoveStats() as Simulator(..., instruments=) to collect a
+    get_next_move latency histogram, WALL / FURNITURE bump counts and,
+    for controllers that set last_mode (RoboVac1), how many moves and
+    bumps each internal mode accounts for. Latency is sampled once per
+    controller call; moves played from a run (get_next_moves) already
+    handed over count as moves but not as calls. Without instruments the
+    Simulator only pays one `is None` check per move.
+
+    usage: python Tournament.py RoboVac1 --levels 5 --stats
+"""
+
+from Simulator import FURNITURE, MOVED, WALL
+
+# latency buckets: bucket b holds calls that took [2**(b-1), 2**b) ns
+BUCKETS = 48
+
+
+class MoveStats:
+    def __init__(self):
+        self.latency = [0] * BUCKETS
+        self.moves = 0
+        self.calls = 0
+        self.bumps = {WALL: 0, FURNITURE: 0}
+        # mode -> [moves, bumps]
+        self.modes = {}
+
+    def record(self, seconds, result, mode=None):
+        """
+        seconds: time of the controller call that returned the move, or
+                 None for a move from a run asked for earlier
+        """
+        self.moves += 1
+        if seconds is not None:
+            self.calls += 1
+            self.latency[min(int(seconds * 1e9).bit_length(), BUCKETS - 1)] += 1
+        counts = self.modes.get(mode)
+        if counts is None:
+            counts = self.modes[mode] = [0, 0]
+        counts[0] += 1
+        if result != MOVED:
+            self.bumps[result] += 1
+            counts[1] += 1
+
+    def merge(self, other):
+        # adds the counts of another MoveStats (e.g. from a worker process)
+        self.moves += other.moves
+        self.calls += other.calls
+        self.latency = [a + b for a, b in zip(self.latency, other.latency)]
+        for result, count in other.bumps.items():
+            self.bumps[result] += count
+        for mode, (moves, bumps) in other.modes.items():
+            counts = self.modes.setdefault(mode, [0, 0])
+            counts[0] += moves
+            counts[1] += bumps
+        return self
+
+    def percentile(self, p):
+        """
+        Upper bound in seconds of the bucket holding the p-th percentile
+        of call latency
+        """
+        rank = p / 100 * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.latency):
+            seen += count
+            if count and seen >= rank:
+                return 2 ** bucket / 1e9
+        return 0.0
+
+    def report(self):
+        lines = [
+            f"moves: {self.moves}  calls: {self.calls}  "
+            f"WALL bumps: {self.bumps[WALL]}  "
+            f"FURNITURE bumps: {self.bumps[FURNITURE]}",
+            "get_next_move latency per call: "
+            + "  ".join(f"p{p} <{self.percentile(p) * 1e6:.1f}us"
+                        for p in (50, 90, 99, 100)),
+        ]
+        for bucket, count in enumerate(self.latency):
+            if count:
+                low = 2 ** (bucket - 1) / 1e3 if bucket else 0.0
+                lines.append(
+                    f"  {low:>10.3f} - {2 ** bucket / 1e3:>10.3f} us {count:>8} "
+                    + "#" * max(1, round(40 * count / self.calls))
+                )
+        lines.append(f"{'mode':<14} {'moves':>8} {'share':>6} {'bumps':>7}")
+        for mode, (moves, bumps) in sorted(self.modes.items(),
+                                           key=lambda item: -item[1][0]):
+            lines.append(
+                f"{mode or '-':<14} {moves:>8} {moves / max(1, self.moves):>6.1%} "
+                f"{bumps:>7}"
+            )
+        return "\n".join(lines)
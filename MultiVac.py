@@ -0,0 +1,393 @@
+"""
+    MultiVac - K vacuums cleaning one room together
+    The free tiles are split into K connected regions of about equal size:
+    K start tiles are spread out over the room (each the tile farthest,
+    in moves, from the ones before it) and the regions grow from them
+    breadth first, taking turns to claim one tile each; a region closed in
+    early then takes border tiles from larger neighbours. Every vacuum gets
+    its own controller, configured with its start tile and a block list
+    that also holds the other regions, so a planner like RoboVac2 covers
+    only its own region (controllers with a known_blocks option are told
+    to use it). All vacuums clean the same Room.
+
+    Every vacuum is kept inside its region: a move into another region
+    is blocked like a move into furniture, which is what the vacuum's
+    block list says it is. Regions do not overlap, so vacuums never run
+    into each other. A vacuum whose region is clean stops.
+
+    Every tick the controllers whose run is used up (see Simulator) are
+    asked for moves concurrently in a thread pool, then one move per
+    vacuum is played. Threads only pay off for controllers that release
+    the GIL (numpy); --workers 0 calls pure python controllers one after
+    the other, which is faster.
+
+    usage: python MultiVac.py RoboVac2 --room random:200x200:0.2 -k 1,2,4,8
+"""
+
+import argparse
+import contextlib
+import inspect
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from Adjacency import DIRECTIONS
+from Room import Room
+from RoomGenerators import make_generator, mask_to_blocks, merge_runs
+from Grid import CLEAN
+from Simulator import FURNITURE, MAX_RUN, MOVED, WALL, move_runs
+from Tournament import load_controller, make_robo_vac, parse_param
+
+
+def spread_starts(adjacency, first, k):
+    """
+    Returns LIST of k start tiles: first, then each time the tile
+    farthest in moves from all the tiles picked so far
+    """
+    starts = [tuple(first)]
+    nearest = np.array(adjacency.distances(first))
+    reachable = nearest >= 0
+    for _ in range(k - 1):
+        i = int(np.argmax(np.where(reachable, nearest, -1)))
+        if nearest[i] <= 0:
+            break  # fewer reachable tiles than vacuums
+        starts.append(adjacency.position(i))
+        nearest = np.minimum(nearest, np.array(adjacency.distances(starts[-1])))
+    return starts
+
+
+def partition(adjacency, starts):
+    """
+    Splits the tiles reachable from starts into len(starts) connected
+    regions; the regions take turns to claim one tile next to them
+    Returns (labels, sizes): labels is a LIST with the region of every
+    tile by flat index (-1 for blocked or unreachable tiles)
+    """
+    labels = [-1] * (adjacency.width * adjacency.height)
+    legal = adjacency.legal
+    offsets = adjacency.offsets
+    frontiers = []
+    sizes = []
+    for region, start in enumerate(starts):
+        i = adjacency.index(start)
+        labels[i] = region
+        frontiers.append(deque([i]))
+        sizes.append(1)
+    # candidates: tiles next to a region, claimed in the order found
+    candidates = [deque() for _ in starts]
+    growing = list(range(len(starts)))
+    while growing:
+        still_growing = []
+        for region in growing:
+            frontier = frontiers[region]
+            queue = candidates[region]
+            claimed = False
+            while not claimed:
+                if not queue:
+                    if not frontier:
+                        break
+                    i = frontier.popleft()
+                    mask = legal[i]
+                    queue.extend(i + offset for d, offset in enumerate(offsets)
+                                 if mask >> d & 1)
+                    continue
+                j = queue.popleft()
+                if labels[j] < 0:
+                    labels[j] = region
+                    frontier.append(j)
+                    sizes[region] += 1
+                    claimed = True
+            if claimed:
+                still_growing.append(region)
+        growing = still_growing
+    balance(adjacency, labels, sizes, starts)
+    return labels, sizes
+
+
+# the 8 tiles around a tile, in order round it; even ones are its neighbours
+RING = ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1))
+
+
+def stays_connected(adjacency, labels, i, region, size):
+    """
+    Returns True if region (size tiles) is still connected without tile i
+    """
+    width, height = adjacency.width, adjacency.height
+    x, y = adjacency.position(i)
+    ring = [0 <= x + dx < width and 0 <= y + dy < height
+            and labels[i + dy * width + dx] == region for dx, dy in RING]
+    # quick test: the region's neighbours of i join up around it
+    if not all(ring):
+        first = ring.index(False)
+        joined = 0
+        touches = False
+        for k in range(first + 1, first + 9):
+            if ring[k % 8]:
+                touches = touches or k % 2 == 0
+            else:
+                joined += touches
+                touches = False
+        if joined <= 1:
+            return True
+    # else search the region without i
+    legal = adjacency.legal
+    offsets = adjacency.offsets
+    start = next(i + offset for d, offset in enumerate(offsets)
+                 if legal[i] >> d & 1 and labels[i + offset] == region)
+    seen = {i, start}
+    frontier = [start]
+    while frontier:
+        j = frontier.pop()
+        for d, offset in enumerate(offsets):
+            k = j + offset
+            if legal[j] >> d & 1 and labels[k] == region and k not in seen:
+                seen.add(k)
+                frontier.append(k)
+    return len(seen) == size
+
+
+def balance(adjacency, labels, sizes, starts):
+    """
+    Evens out the regions of partition (labels and sizes are changed in
+    place): a region closed in by the others early on takes border tiles
+    from a neighbouring region at least two tiles larger, as long as that
+    region stays connected. Start tiles stay where they are.
+    """
+    legal = adjacency.legal
+    offsets = adjacency.offsets
+    starts = {adjacency.index(start) for start in starts}
+    moved = True
+    while moved:
+        moved = False
+        queue = deque(i for i, region in enumerate(labels) if region >= 0)
+        while queue:
+            i = queue.popleft()
+            if i in starts:
+                continue
+            region = labels[i]
+            mask = legal[i]
+            smallest = region
+            for d, offset in enumerate(offsets):
+                if mask >> d & 1 and sizes[labels[i + offset]] < sizes[smallest]:
+                    smallest = labels[i + offset]
+            if (sizes[smallest] >= sizes[region] - 1
+                    or not stays_connected(adjacency, labels, i, region, sizes[region])):
+                continue
+            labels[i] = smallest
+            sizes[region] -= 1
+            sizes[smallest] += 1
+            moved = True
+            queue.extend(i + offset for d, offset in enumerate(offsets)
+                         if mask >> d & 1)
+
+
+def region_config(room, labels, region, start):
+    """
+    Room config (see Room.get_room_config) for the vacuum of one region:
+    every tile of the other regions is added to the block list
+    """
+    labels = np.array(labels).reshape(room.max_height, room.max_width)
+    others = labels >= 0
+    others &= labels != region
+    blocks = list(room.block_list) + merge_runs(mask_to_blocks(others))
+    return [(room.max_width, room.max_height), tuple(start), blocks]
+
+
+class MultiSimulator:
+    def __init__(self, room, robo_vacs, starts, labels, max_cycles=400,
+                 workers=None, max_run=MAX_RUN):
+        """
+        robo_vacs: one controller per vacuum, standing on starts
+        labels: region of every tile by flat index (see partition);
+                vacuum i stays in region i
+        workers: threads for controller calls (default one per vacuum,
+                 0 calls them one after the other)
+        """
+        self.room = room
+        self.robo_vacs = robo_vacs
+        self.runs = [move_runs(robo_vac) for robo_vac in robo_vacs]
+        self.labels = labels
+        self.positions = [tuple(start) for start in starts]
+        for pos in self.positions:
+            room.add_clean_pos(pos)
+        # dirty tiles left in every region; a vacuum stops at 0
+        regions = np.array(labels).reshape(room.max_height, room.max_width)
+        dirty = regions[(regions >= 0) & ~room.grid.mask(CLEAN)]
+        self.dirty = np.bincount(dirty, minlength=len(robo_vacs)).tolist()
+        self.max_cycles = max_cycles
+        self.max_run = max_run
+        workers = len(robo_vacs) if workers is None else workers
+        self.pool = ThreadPoolExecutor(workers) if workers > 1 else None
+
+        # current run of every vacuum and the index of its next move
+        self.run_moves = [()] * len(robo_vacs)
+        self.run_index = [0] * len(robo_vacs)
+
+        # ticks played; every working vacuum moves (or is blocked) once per tick
+        self.ticks = 0
+        self.moves = [0] * len(robo_vacs)
+        self.bumps = {WALL: 0, FURNITURE: 0}
+        self.calls = 0
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def is_done(self):
+        return (self.is_success() or self.ticks >= self.max_cycles
+                or not any(self.dirty))
+
+    def is_success(self):
+        return self.room.clean_count == self.room.max_tiles
+
+    def ask(self, i, max_n):
+        return self.runs[i].get_next_moves(self.positions[i], max_n)
+
+    def step(self):
+        """
+        Plays one tick: one move per vacuum whose region is not clean yet
+        Returns LIST of the move results, by vacuum (None if it stopped)
+        """
+        working = [i for i in range(len(self.robo_vacs)) if self.dirty[i]]
+        # CALL ROBO VACS whose run is used up, all at once
+        asking = [i for i in working if self.run_index[i] >= len(self.run_moves[i])]
+        if asking:
+            max_n = max(1, min(self.max_run, self.max_cycles - self.ticks))
+            if self.pool is not None and len(asking) > 1:
+                runs = list(self.pool.map(self.ask, asking, [max_n] * len(asking)))
+            else:
+                runs = [self.ask(i, max_n) for i in asking]
+            for i, run in zip(asking, runs):
+                self.run_moves[i] = run
+                self.run_index[i] = 0
+            self.calls += len(asking)
+        self.ticks += 1
+
+        room = self.room
+        adjacency = room.adjacency
+        labels = self.labels
+        results = [None] * len(self.robo_vacs)
+        for i in working:
+            dir = self.run_moves[i][self.run_index[i]]
+            self.run_index[i] += 1
+            self.moves[i] += 1
+            x, y = self.positions[i]
+            tile = y * adjacency.width + x
+            if (dir in (0, 1, 2, 3) and adjacency.legal[tile] >> dir & 1
+                    and labels[tile + adjacency.offsets[dir]] == i):
+                next_pos = (x + DIRECTIONS[dir][0], y + DIRECTIONS[dir][1])
+                self.positions[i] = next_pos
+                clean_count = room.clean_count
+                room.add_clean_pos(next_pos)
+                self.dirty[i] -= room.clean_count - clean_count
+                result = MOVED
+            elif dir not in (0, 1, 2, 3) or adjacency.leaves_room((x, y), dir):
+                result = WALL
+            else:
+                # furniture, or another region: a block to this vacuum
+                result = FURNITURE
+            if result != MOVED:
+                self.bumps[result] += 1
+                # a run stops at its first blocked move
+                self.run_index[i] = len(self.run_moves[i])
+            results[i] = result
+        room.vac_pos = self.positions[0]
+        return results
+
+    def run(self):
+        # GAME LOOP ---------
+        while not self.is_done():
+            self.step()
+        return self.results()
+
+    def results(self):
+        """
+        Returns DICT with the numbers of the game; ticks is the time to
+        clean the room, moves the work of all vacuums together
+        """
+        return {
+            "success": self.is_success(),
+            "vacuums": len(self.robo_vacs),
+            "coverage": self.room.clean_count / self.room.max_tiles,
+            "ticks": self.ticks,
+            "moves": sum(self.moves),
+            "tiles_cleaned": self.room.clean_count,
+            "max_tiles": self.room.max_tiles,
+            "wall_bumps": self.bumps[WALL],
+            "furniture_bumps": self.bumps[FURNITURE],
+            "calls": self.calls,
+        }
+
+
+def run_multi(controller, room, k, max_cycles=400, workers=None, seed=0,
+              params=None):
+    """
+    Partitions room for k vacuums, gives each a controller and plays
+    the game; returns (results DICT, region sizes)
+    """
+    robo_vac_class = load_controller(controller)
+    starts = spread_starts(room.adjacency, room.vac_pos, k)
+    labels, sizes = partition(room.adjacency, starts)
+    # the other regions are in the block list: have mapping controllers
+    # (RoboVac3) start from it rather than bump into every border
+    params = dict(params or {})
+    if "known_blocks" in inspect.signature(robo_vac_class).parameters:
+        params.setdefault("known_blocks", True)
+    robo_vacs = [
+        make_robo_vac(robo_vac_class, region_config(room, labels, region, start),
+                      random.Random(f"{seed}:agent{region}"), params)
+        for region, start in enumerate(starts)
+    ]
+    sim = MultiSimulator(room, robo_vacs, starts, labels, max_cycles, workers)
+    try:
+        return sim.run(), sizes
+    finally:
+        sim.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("controller", help="controller module name or .py file")
+    parser.add_argument("-k", "--vacuums", default="1,2,4",
+                        help="vacuum counts to compare, e.g. 1,2,4,8")
+    parser.add_argument("--room", metavar="SPEC", default="random:100x100:0.2",
+                        help="generated room (default random:100x100:0.2)")
+    parser.add_argument("--seed", type=int, default=0, help="room seed")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="threads for controller calls (default: one per vacuum)")
+    parser.add_argument("--max-cycles", type=int, default=1000000)
+    parser.add_argument("--param", type=parse_param, action="append", default=[],
+                        metavar="NAME=VALUE", help="controller keyword argument")
+    args = parser.parse_args(argv)
+
+    layout = make_generator(args.room)(random.Random(f"0:{args.seed}:room"))
+    base_ticks = None
+    print(f"{'k':>3} {'success':>7} {'coverage':>8} {'ticks':>8} {'speedup':>7} "
+          f"{'moves':>8} {'regions':>13} {'bumps':>6} {'us/tick':>8}")
+    for k in (int(part) for part in args.vacuums.split(",")):
+        room = Room(0, layout, random.Random(f"0:{args.seed}:room"))
+        start = time.perf_counter()
+        # own controllers log through EventLog; keep any that print quiet
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results, sizes = run_multi(args.controller, room, k, args.max_cycles,
+                                       args.workers, args.seed, dict(args.param))
+        seconds = time.perf_counter() - start
+        if base_ticks is None:
+            base_ticks = results["ticks"]
+        bumps = results["wall_bumps"] + results["furniture_bumps"]
+        ticks = results["ticks"]
+        # a room that is clean from the start takes no ticks
+        speedup = f"{base_ticks / ticks:.2f}" if ticks else "-"
+        per_tick = f"{seconds / ticks * 1e6:.1f}" if ticks else "-"
+        print(f"{k:>3} {results['success']!s:>7} {results['coverage']:>8.3f} "
+              f"{ticks:>8} {speedup:>7} "
+              f"{results['moves']:>8} {f'{min(sizes)}-{max(sizes)}':>13} "
+              f"{bumps:>6} {per_tick:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+    Oracle - fewest moves that can clean a room, for scoring controllers
+    Given a room config (Room.get_room_config()) it returns bounds on the
+    number of moves a vacuum needs to visit every free tile reachable
+    from its start:
+
+    lower_bound  the largest of
+                 - tiles - 1, plus one extra move for every dead end
+                   (a tile with one free neighbour) except the last tile
+                   visited: leaving a dead end revisits a tile
+                 - tiles - 1, plus one extra move for every connected
+                   group of unvisited tiles but one: going from one group
+                   to the next crosses a visited tile
+                 - the checkerboard bound: moves alternate tile colours,
+                   so m moves visit at most (m + 2) // 2 tiles of the
+                   start colour and (m + 1) // 2 of the other
+    upper_bound  length of the CoveragePlanner route (what RoboVac2 plays),
+                 or the optimum when it is known
+    optimal      exact minimum from an A* search over (tile, visited set)
+                 with the same bounds as heuristic, for rooms of up to
+                 exact_tiles tiles; None when the search was not run or
+                 gave up after max_states expansions
+
+    lower_bound() takes a few flat passes over the Adjacency table, so
+    it stays fast on the largest generated rooms; the bitmask search
+    state of CoverageSearch is only built for the exact search.
+
+    Results are kept in the PlanCache, keyed on the layout.
+
+    usage: python Oracle.py --level 5 --seed 3
+           python Oracle.py --room random:6x6:0.2
+"""
+
+import argparse
+import heapq
+import random
+
+from Adjacency import Adjacency
+from CoveragePlanner import plan_coverage
+from Grid import BLOCK, Grid
+from PlanCache import default_cache
+from Room import Room
+from RoomGenerators import make_generator
+
+# rooms with more reachable tiles only get bounds
+EXACT_TILES = 64
+# A* expansions before the exact search gives up
+MAX_STATES = 100000
+
+
+def popcount(bits):
+    return bin(bits).count("1")
+
+
+def lower_bound(adjacency, start, distances=None):
+    """
+    Fewest moves that can visit every tile reachable from start (the
+    bounds of CoverageSearch.lower_bound at the start); linear in the
+    number of tiles
+    distances: adjacency.distances(start), if already known
+    """
+    if distances is None:
+        distances = adjacency.distances(start)
+    legal = adjacency.legal
+    width = adjacency.width
+    left = 0
+    dead_ends = 0
+    colours = [0, 0]
+    for i, distance in enumerate(distances):
+        if distance > 0:
+            left += 1
+            if legal[i] in (1, 2, 4, 8):
+                dead_ends += 1
+            colours[(i % width + i // width) & 1] += 1
+    if not left:
+        return 0
+    moves = left + max(0, dead_ends - 1, pockets(adjacency, start) - 1)
+    # checkerboard: the first move goes to the other colour
+    same = colours[(start[0] + start[1]) & 1]
+    other = left - same
+    return max(moves, 2 * other - 1, 2 * same)
+
+
+def pockets(adjacency, start):
+    """
+    Number of connected groups the tiles reachable from start fall into
+    once start is taken out; every group holds a neighbour of start
+    """
+    legal = adjacency.legal
+    offsets = adjacency.offsets
+    seen = bytearray(adjacency.width * adjacency.height)
+    seen[adjacency.index(start)] = 1
+    count = 0
+    for _, _, first in adjacency.moves(tuple(start)):
+        if seen[first]:
+            continue
+        count += 1
+        seen[first] = 1
+        stack = [first]
+        while stack:
+            i = stack.pop()
+            mask = legal[i]
+            for d in range(4):
+                if mask >> d & 1 and not seen[i + offsets[d]]:
+                    seen[i + offsets[d]] = 1
+                    stack.append(i + offsets[d])
+    return count
+
+
+class CoverageSearch:
+    """
+    Graph of the tiles reachable from start, numbered 0.. with the
+    start as tile 0, plus the bounds on covering what is left of it;
+    states are bitmasks of the visited tiles, for small rooms
+    """
+
+    def __init__(self, adjacency, start, distances=None):
+        if distances is None:
+            distances = adjacency.distances(start)
+        tiles = [adjacency.index(start)]
+        tiles += [i for i, d in enumerate(distances) if d > 0]
+        local = {tile: k for k, tile in enumerate(tiles)}
+        self.size = len(tiles)
+        self.neighbours = [
+            [local[tile + offset] for d, offset in enumerate(adjacency.offsets)
+             if adjacency.legal[tile] >> d & 1]
+            for tile in tiles
+        ]
+        width = adjacency.width
+        # colour 0 tiles, as bits, and the colour of every tile
+        self.colour = [(tile % width + tile // width) & 1 for tile in tiles]
+        self.colour_bits = [0, 0]
+        self.dead_end_bits = 0
+        for k in range(self.size):
+            self.colour_bits[self.colour[k]] |= 1 << k
+            if len(self.neighbours[k]) == 1:
+                self.dead_end_bits |= 1 << k
+        self.full = (1 << self.size) - 1
+        self.distance_rows = None
+
+    def lower_bound(self, pos=0, visited=1):
+        """
+        Fewest moves that can visit every tile not in the visited bits
+        starting from tile pos (pos is visited)
+        """
+        rest = self.full & ~visited
+        if not rest:
+            return 0
+        left = popcount(rest)
+        # moves to reach the nearest unvisited tile cross visited tiles
+        if self.distance_rows is None:
+            nearest = 1
+        else:
+            row = self.distance_rows[pos]
+            nearest = min(row[k] for k in range(self.size) if rest >> k & 1)
+        dead_ends = popcount(rest & self.dead_end_bits)
+        moves = nearest - 1 + left + max(0, dead_ends - 1, self.pockets(rest) - 1)
+        # checkerboard: the next tile is of the other colour
+        same = popcount(rest & self.colour_bits[self.colour[pos]])
+        other = left - same
+        return max(moves, 2 * other - 1, 2 * same)
+
+    def pockets(self, rest):
+        # connected groups of unvisited tiles; going from one to the
+        # next crosses at least one visited tile
+        count = 0
+        while rest:
+            count += 1
+            low = rest & -rest
+            rest ^= low
+            stack = [low.bit_length() - 1]
+            while stack:
+                for j in self.neighbours[stack.pop()]:
+                    if rest >> j & 1:
+                        rest ^= 1 << j
+                        stack.append(j)
+        return count
+
+    def all_distances(self):
+        # BFS distance between every pair of tiles, for the exact search
+        rows = []
+        for source in range(self.size):
+            row = [-1] * self.size
+            row[source] = 0
+            frontier = [source]
+            while frontier:
+                next_frontier = []
+                for k in frontier:
+                    for j in self.neighbours[k]:
+                        if row[j] < 0:
+                            row[j] = row[k] + 1
+                            next_frontier.append(j)
+                frontier = next_frontier
+            rows.append(row)
+        self.distance_rows = rows
+
+    def exact(self, upper_bound=None, max_states=MAX_STATES):
+        """
+        Returns the fewest moves visiting every tile, or None after
+        max_states expansions; paths longer than upper_bound are pruned
+        """
+        if self.distance_rows is None:
+            self.all_distances()
+        limit = float("inf") if upper_bound is None else upper_bound
+        best = {(0, 1): 0}
+        # (f, -g, tile, visited): deeper states first on ties
+        queue = [(self.lower_bound(0, 1), 0, 0, 1)]
+        expanded = 0
+        while queue:
+            _, neg_g, pos, visited = heapq.heappop(queue)
+            g = -neg_g
+            if visited == self.full:
+                return g
+            if best[(pos, visited)] < g:
+                continue  # reached again by a shorter path
+            expanded += 1
+            if expanded > max_states:
+                return None
+            for k in self.neighbours[pos]:
+                state = (k, visited | 1 << k)
+                if g + 1 < best.get(state, limit + 1):
+                    f = g + 1 + self.lower_bound(*state)
+                    if f <= limit:
+                        best[state] = g + 1
+                        heapq.heappush(queue, (f, -g - 1, k, state[1]))
+        return None
+
+
+def solve(config_list, exact_tiles=EXACT_TILES, max_states=MAX_STATES):
+    """
+    Returns DICT with tiles (reachable from the start), lower_bound,
+    upper_bound and optimal (None if unknown) for a room config
+    """
+    (width, height), start, block_list = config_list[:3]
+    grid = Grid(width, height)
+    grid.add_rects(block_list, BLOCK)
+    adjacency = Adjacency.from_grid(grid)
+    start = tuple(start)
+    distances = adjacency.distances(start)
+    tiles = sum(1 for distance in distances if distance >= 0)
+    route = default_cache().get(
+        "coverage",
+        config_list,
+        lambda: plan_coverage(width, height, block_list, start),
+    )
+    lower = lower_bound(adjacency, start, distances)
+    upper = len(route)
+    optimal = None
+    if lower == upper:
+        optimal = lower
+    elif tiles <= exact_tiles:
+        search = CoverageSearch(adjacency, start, distances)
+        optimal = search.exact(upper, max_states)
+    if optimal is not None:
+        lower = upper = optimal
+    return {
+        "tiles": tiles,
+        "lower_bound": lower,
+        "upper_bound": upper,
+        "optimal": optimal,
+    }
+
+
+def oracle(config_list):
+    # solve() through the PlanCache
+    return default_cache().get("oracle", config_list, lambda: solve(config_list))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("--level", type=int, default=0)
+    parser.add_argument("--room", metavar="SPEC",
+                        help="generated room, e.g. random:6x6:0.2 or maze:9x9")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="episode seed (as in Tournament)")
+    args = parser.parse_args(argv)
+
+    room_rng = random.Random(f"{args.level}:{args.seed}:room")
+    layout = make_generator(args.room)(room_rng) if args.room else None
+    room = Room(args.level, layout, room_rng)
+    result = oracle(room.get_room_config())
+    print(f"Room: {room.max_width}x{room.max_height}  Start: {room.vac_pos}  "
+          f"Tiles: {result['tiles']}")
+    print(f"lower bound: {result['lower_bound']}  "
+          f"upper bound (planner): {result['upper_bound']}  "
+          f"optimal: {result['optimal'] if result['optimal'] is not None else '?'}")
+
+
+if __name__ == "__main__":
+    main()
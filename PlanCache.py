@@ -0,0 +1,100 @@
+"""
+    PlanCache - memoize per-layout planning results across episodes
+    Room only picks from 3x3 sizes, 6 block levels and a start position, so
+    the same layout comes up again and again. Planner-style controllers
+    can keep a coverage route or distance field here, keyed on the room
+    layout, instead of recomputing it every episode.
+
+    Entries live in memory with LRU eviction; with a path they are also
+    pickled to disk (one file per key) so other processes and later runs
+    can reuse them. Set ROBOVAC_PLAN_CACHE=<dir> to give the default cache
+    a disk store.
+"""
+
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+
+def layout_key(config_list):
+    """
+    (max_width, max_height, block_list, vac_pos) from
+    Room.get_room_config() as a hashable tuple
+    """
+    (width, height), vac_pos, block_list = config_list[:3]
+    return (width, height, tuple(tuple(b) for b in block_list), tuple(vac_pos))
+
+
+class PlanCache:
+    def __init__(self, maxsize=4096, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    def get(self, kind, config_list, compute):
+        """
+        Returns the cached value for this kind of plan and room layout;
+        calls compute() to make it on a miss
+        """
+        key = (kind,) + layout_key(config_list)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        value = self.load(key)
+        if value is None:
+            self.misses += 1
+            value = compute()
+            self.save(key, value)
+        else:
+            self.hits += 1
+
+        self.entries[key] = value
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)  # least recently used
+        return value
+
+    def clear(self):
+        self.entries.clear()
+
+    # Disk store ------
+    def file_name(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.path, f"{key[0]}-{digest}.pickle")
+
+    def load(self, key):
+        if not self.path:
+            return None
+        try:
+            with open(self.file_name(key), "rb") as f:
+                stored_key, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return value if stored_key == key else None
+
+    def save(self, key, value):
+        if not self.path:
+            return
+        file_name = self.file_name(key)
+        # write then rename, so parallel workers never read half a file
+        temp_name = f"{file_name}.{os.getpid()}.tmp"
+        with open(temp_name, "wb") as f:
+            pickle.dump((key, value), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_name, file_name)
+
+
+_default_cache = None
+
+
+def default_cache():
+    # shared cache for this process, created on first use
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PlanCache(path=os.environ.get("ROBOVAC_PLAN_CACHE"))
+    return _default_cache
@@ -1,16 +1,23 @@
 """
     RoboVac - clean the room
     note: PyGame needs an empty file __init__.py in directory to draw!
+    pygame, the window and the robovac picture are loaded on first use
+    and kept for later games, so importing this module costs no pygame
+    start up (headless runs and worker processes never pay for it)
     v. 0.90
 """
 
-import random
-
-import pygame
+import os
 import sys
+import threading
 
 # modify RoboVac0 or copy and create your own file
 from RoboVac1 import RoboVac
+from EventLog import BLOCKED, INFO, MOVE_COUNT, default_log, print_sink
+from Instrumentation import MoveStats
+from ResultsStore import ResultsStore
+from Room import Room
+from Simulator import Simulator, MOVED
 
 BLACK = (0, 0, 0)
 GOLD = (200, 0, 0)
@@ -20,144 +27,49 @@ BROWN = (165, 42, 42)
 ORANGE = (255, 140, 0)
 YELLOW = (240, 240, 130)
 
-# load images
-RoboVacPic = pygame.image.load("robovac.png")
+ROBOVAC_PNG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "robovac.png")
+
+# pygame module, display surface and robovac picture; None until first
+# used (see load_pygame, get_screen, robovac_pic)
+pygame = None
+SCREEN = None
+RoboVacPic = None
+
 
+def load_pygame():
+    # imports and initialises pygame the first time it is needed
+    global pygame, SCREEN, RoboVacPic
+    if pygame is None:
+        import pygame as module
 
-class Room:
-    def __init__(self, level):
+        pygame = module
+    if not pygame.get_init():
+        # first use, or pygame.quit() dropped the old surfaces
         pygame.init()
-        self.game_level = level
-
-        # sets up room (size) with blocks and vacuum start position
-        # -Robovac is initialized with data structure containing
-        #   all room data
-
-        # window  - varies in size
-        window_size_list = [360, 390, 420]
-        self.window_width = random.choice(window_size_list)
-        self.window_height = random.choice(window_size_list)
-
-        # grid max values for width and height
-        self.room_blocksize = 30
-        self.max_width = (int)(self.window_width / self.room_blocksize)
-        self.max_height = (int)(self.window_height / self.room_blocksize)
-        # for grid logic
-        self.max_x = (self.window_width / self.room_blocksize) - 1
-        self.max_y = (self.window_height / self.room_blocksize) - 1
-
-        # blocks - number of blocks depends on game_level
-        self.block_list = []
-
-        if self.game_level >= 1:
-            self.block_list.append((1, 2, 4, 1))
-
-        if self.game_level >= 2:
-            self.block_list.append((1, 2, 4, 1))
-            self.block_list.append((3, 2, 1, 4))
-            self.block_list.append((1, 2, 4, 2))
-
-        if self.game_level >= 3:
-            self.block_list.append((1, 2, 4, 1))
-            self.block_list.append((6, 6, 4, 1))
-            self.block_list.append((9, 6, 1, 3))
-            self.block_list.append((6, 8, 4, 1))
-
-        if self.game_level >= 4:
-            self.block_list.append((0, 8, 4, 1))
-
-        if self.game_level >= 5:
-            self.block_list.append((10, 10, 4, 1))
-
-        # vacuum random positioning
-        x = 0
-        y = 0
-        dx = 3
-        dy = 3  # dist from edge
-
-        intersect = True
-        while intersect:
-            x = random.randrange(dx, self.max_x)
-            y = random.randrange(dy, self.max_y)
-            intersect = self.does_pos_intersect_blocks((x, y))
-        self.vac_pos = (x, y)  # starting location for vacuum
-
-        # define sets with positions as tuples; useful utilities
-        self.clean_set = set()
-        self.clean_set.add(self.vac_pos)
-
-        # create set with all tiles
-        self.free_tiles_set = set()
-        for x in range(self.max_width):
-            for y in range(self.max_height):
-                self.free_tiles_set.add((x, y))
-
-        # BLOCKS
-        # create set of all block positions from block list
-        self.block_tiles_set = set()
-
-        for b in self.block_list:
-            for x in range(b[0], b[0] + b[2]):
-                for y in range(b[1], b[1] + b[3]):
-                    self.block_tiles_set.add((x, y))
-
-        self.free_tiles_set = self.free_tiles_set - self.block_tiles_set
-
-        # easily get max number of tiles that need cleaning
-        self.max_tiles = len(self.free_tiles_set)
-
-        # other  for display
-        self.font = pygame.font.SysFont("Arial", 20)
-
-    def get_room_config(self):
-        """
-        Returns LIST with all the info RoboVac needs;
-              passed to RoboVac constructor
-        [ (room_width, room_height), (vac_x, vac_y) [list-of-blocks] ]
-         note: list-of-blocks is list of tuples (x,y,width, height)
-        """
-        room_config_list = [
-            (self.max_width, self.max_height),
-            self.vac_pos,
-            self.block_list,
-        ]
-        return room_config_list
-
-    # Utility Methods ------
-    def add_clean_pos(self, xytuple):
-        self.clean_set.add(xytuple)
-
-    def rect_intersect(self, pos, rect):
-        rx, ry, width, height = rect
-        x, y = pos
-        is_intersect = x >= rx and x < (rx + width) and y >= ry and y < (ry + height)
-        return is_intersect
-
-    def does_pos_intersect_blocks(self, pos):
-        #  check all blocks
-        for rect in self.block_list:
-            if self.rect_intersect(pos, rect):
-                return True
-        return False
-
-    def is_ok_next_pos(self, xytuple):
-        x, y = xytuple
-        if x < 0 & x > self.max_x & y < 0 & y > self.max_y:
-            return False
-        # check intersect with blocks
-        for rect in self.block_list:
-            rx, ry, width, height = rect
-            if x > rx & x < (rx + width) & y > ry & y < (ry + height):
-                return False
-        return True
-
-    def __str__(self):
-        return (
-            f"cpos={self.vac_pos},max_x={self.max_x} \
-        max_y={self.max_y}, window:({self.window_width}, "
-            f"{self.window_height}) \
-         blocksize={self.room_blocksize}  clean={self.clean_set}"
-        )
+        SCREEN = RoboVacPic = None
+    return pygame
+
+
+def get_screen(size):
+    """
+    Returns the display surface, opening the window on the first call;
+    later games reuse it unless the room size changed
+    """
+    global SCREEN
+    load_pygame()
+    if SCREEN is None or SCREEN.get_size() != tuple(size):
+        SCREEN = pygame.display.set_mode(size)
+    return SCREEN
+
+
+def robovac_pic():
+    # loaded once, converted to the display format when there is one
+    global RoboVacPic
+    if RoboVacPic is None:
+        RoboVacPic = load_pygame().image.load(ROBOVAC_PNG)
+        if pygame.display.get_surface() is not None:
+            RoboVacPic = RoboVacPic.convert_alpha()
+    return RoboVacPic
 
 
 def get_date_time():
@@ -172,24 +84,32 @@ def get_date_time():
 
 
 #  Utility Functions for Drawing (PyGame) -----------------------
-def draw_tile(room, x, y):
+#  surface defaults to the SCREEN
+def tile_rect(room, x, y):
     x_draw = x * room.room_blocksize
     y_draw = y * room.room_blocksize
-    rect = pygame.Rect(x_draw, y_draw, room.room_blocksize, room.room_blocksize)
+    return pygame.Rect(x_draw, y_draw, room.room_blocksize, room.room_blocksize)
+
+
+def draw_tile(room, x, y, surface=None):
+    surface = surface or SCREEN
+    rect = tile_rect(room, x, y)
     # draw rect
-    pygame.draw.rect(SCREEN, GREEN, rect, 0)  # 0 means fill!!
-    pygame.draw.rect(SCREEN, WHITE, rect, 1)
+    pygame.draw.rect(surface, GREEN, rect, 0)  # 0 means fill!!
+    pygame.draw.rect(surface, WHITE, rect, 1)
+    return rect
 
 
-def draw_all_tiles(room):
+def draw_all_tiles(room, surface=None):
     for r_tuple in room.clean_set:
         x, y = r_tuple
-        draw_tile(room, x, y)
+        draw_tile(room, x, y, surface)
     # draw vacuum
-    draw_vac(room)
+    draw_vac(room, surface)
 
 
-def draw_blocks(room):
+def draw_blocks(room, surface=None):
+    surface = surface or SCREEN
     for rect in room.block_list:
         x, y, w, h = rect
         x_draw = x * room.room_blocksize
@@ -198,30 +118,137 @@ def draw_blocks(room):
             x_draw, y_draw, room.room_blocksize * w, room.room_blocksize * h
         )
         # draw rect
-        pygame.draw.rect(SCREEN, ORANGE, rect, 0)  # 0 means fill!!
+        pygame.draw.rect(surface, ORANGE, rect, 0)  # 0 means fill!!
 
 
-def draw_vac(room):
+def draw_vac(room, surface=None):
     # draw RoboVac at it's current location
-    global SCREEN, RoboVacPic
-    global GOLD
+    surface = surface or SCREEN
     x, y = room.vac_pos
     blocksize = room.room_blocksize
-    SCREEN.blit(RoboVacPic, (x * blocksize, y * blocksize))
-    pygame.display.flip()
+    surface.blit(robovac_pic(), (x * blocksize, y * blocksize))
+    return tile_rect(room, x, y)
 
 
-def drawGrid(room):
+def drawGrid(room, surface=None):
     # draw basic room grid..
+    surface = surface or SCREEN
     for x in range(0, room.window_width, room.room_blocksize):
         for y in range(0, room.window_height, room.room_blocksize):
             rect = pygame.Rect(x, y, room.room_blocksize, room.room_blocksize)
-            pygame.draw.rect(SCREEN, WHITE, rect, 1)
+            pygame.draw.rect(surface, WHITE, rect, 1)
 
 
-def main(game_level):
-    global SCREEN
+class Renderer:
+    """
+    Draws the room incrementally: grid and furniture are pre-rendered once
+    on a background surface; each frame only the tile the vacuum left,
+    tiles cleaned since the last frame and the tile it is on are redrawn,
+    and only those rects are presented
+    """
+
+    def __init__(self, room, screen):
+        self.room = room
+        self.screen = screen
+
+        # static layer: black background, grid, furniture
+        self.background = pygame.Surface(screen.get_size())
+        self.background.fill(BLACK)
+        drawGrid(room, self.background)
+        draw_blocks(room, self.background)
+
+        self.vac_pos = room.vac_pos
+        self.redraw()
+
+    def redraw(self):
+        # full frame: background, every clean tile, vacuum
+        self.screen.blit(self.background, (0, 0))
+        draw_all_tiles(self.room, self.screen)
+        pygame.display.flip()
 
+    def update(self, vac_pos, cleaned=()):
+        """
+        vac_pos: current vacuum position
+        cleaned: tiles cleaned since the last update
+        """
+        if vac_pos == self.vac_pos and not cleaned:
+            return
+        dirty = []
+        for x, y in [self.vac_pos, *cleaned, vac_pos]:
+            dirty.append(draw_tile(self.room, x, y, self.screen))
+        self.screen.blit(robovac_pic(), dirty[-1])
+        self.vac_pos = vac_pos
+        pygame.display.update(dirty)
+
+
+class SimulationThread(threading.Thread):
+    """
+    Runs the Simulator on its own thread and publishes snapshots
+    (vacuum position, tiles cleaned since the last snapshot) for the
+    renderer, so drawing never slows the simulation down and a slow
+    controller never freezes the window
+    """
+
+    def __init__(self, sim, delay_time=0):
+        # daemon: a controller stuck in get_next_move can't keep python alive
+        super().__init__(daemon=True)
+        self.sim = sim
+        self.delay = delay_time / 1000  # game delay in seconds between cycles
+        self.stop_event = threading.Event()
+
+        self.lock = threading.Lock()
+        self.vac_pos = sim.room.vac_pos
+        self.cleaned = []  # tiles cleaned since the last snapshot
+        self.done = False
+
+    def run(self):
+        sim = self.sim
+        room = sim.room
+        events = default_log()
+        while not sim.is_done() and not self.stop_event.is_set():
+            if (sim.move_count % 50) == 0:
+                events.emit(INFO, MOVE_COUNT, sim.move_count)
+
+            clean_count = room.clean_count
+            # CALL ROBO VAC and apply the move (see Simulator.step)
+            result = sim.step()
+
+            if result != MOVED:  # WALL or FURNITURE
+                events.emit(INFO, BLOCKED, sim.last_dir, result)
+            with self.lock:
+                self.vac_pos = room.vac_pos
+                if room.clean_count != clean_count:
+                    self.cleaned.append(room.vac_pos)
+
+            # CONTROLS GAME SPEED
+            if self.delay:
+                self.stop_event.wait(self.delay)
+        with self.lock:
+            self.done = True
+
+    def snapshot(self):
+        """
+        Returns (vac_pos, tiles cleaned since last snapshot, done)
+        """
+        with self.lock:
+            cleaned = self.cleaned
+            self.cleaned = []
+            return self.vac_pos, cleaned, self.done
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def play(game_level, delay_time=100, fps=30, stats=False):
+    """
+    Plays and draws one game; the window stays open for the next one
+    Returns DICT of results (see Simulator.results)
+    delay_time: game delay in milliseconds between cycles (0 = flat out)
+    fps: frames drawn per second; moves between frames are not drawn
+         one by one, but no cleaned tile is missed
+    stats: print move latency, bumps and RoboVac modes at the end
+           (see Instrumentation)
+    """
     # max # game cycles allowed robot
     max_cycles = 400
 
@@ -232,113 +259,86 @@ def main(game_level):
     config_list = room.get_room_config()
     robo_vac = RoboVac(config_list)
 
-    # set up the screen display ----------------
-    SCREEN = pygame.display.set_mode((room.window_width, room.window_height))
-    SCREEN.fill(BLACK)
+    # game rules (moves, walls, furniture, coverage) live in the Simulator
+    sim = Simulator(room, robo_vac, max_cycles, MoveStats() if stats else None)
 
-    drawGrid(room)  # draws grid - white outlines; black bkgnd
-    draw_vac(room)  # draw vac at initial random pos
-    draw_blocks(room)
+    # set up the screen display (opened once, reused) ----------------
+    screen = get_screen((room.window_width, room.window_height))
 
-    pygame.display.update()
+    # draws grid - white outlines; black bkgnd; blocks; vac at initial pos
+    renderer = Renderer(room, screen)
 
     ## CONTROL GAME SPEED   ** OK to change  **
-    delay_time = 100
-    # game delay in milliseconds between cycles
-
-    move_count = 5  # track number of moves
-
-    # GAME LOOP ---------
-    while True:
-        if (move_count % 50) == 0:
-            print(f"Move Count: {move_count}")
-
-        # check if done..
-        if len(room.clean_set) == room.max_tiles or move_count > max_cycles:
-            result_str = " SUCCESS!"
-            if move_count > max_cycles:
-                result_str = " OUT OF TIME"
-            print(
-                f"--------------------------------------\n"
-                f"RESULTS ***** {result_str}\n"
-                f"{robo_vac.name} ID={robo_vac.id} {get_date_time()}"
-                f"\nLevel: {room.game_level}  Coverage: "
-                f"{((len(room.clean_set)/room.max_tiles)*100):.1f}%\n"
-                f"Cycles: {move_count} Tiles Cleaned: "
-                f"{len(room.clean_set)} Max Tiles: {room.max_tiles}"
-                f"Total Tiles {room.max_tiles}\n"
-                f"Efficiency: {(room.max_tiles/move_count):.2f}"
-            )
-            # results to logfile
-            result_str = (
-                f"{get_date_time()} {robo_vac.id}"
-                f" {robo_vac.name} "
-                f" L{room.game_level} "
-                f"Coverage:{((len(room.clean_set)/room.max_tiles)):.2f} "
-                f"Eff:{(room.max_tiles/move_count):.2f}\n"
-            )
-            print(result_str)
-            f = open("log.txt", "a")
-            f.write(result_str)
-            f.close()
-
-            pygame.quit()
-            sys.exit()
-
-        else:  # play game  -------------------------
-            move_count += 1
-            pygame.display.update()
-
-            # CALL ROBO VAC --Returns Direction based on location
-            dir = robo_vac.get_next_move(room.vac_pos)
-            #  ###################################################
-
-            # Determine if direction results in legal move
-            # IF YES, update robot position, else pos remains same
-
-            x, y = room.vac_pos  # current position
-            # adjust based on direction only if new pos inside room
-            if dir == 0:
-                if y > 0:
-                    y = y - 1
-            elif dir == 1:
-                if x < room.max_x:
-                    x = x + 1
-            elif dir == 2:
-                if y < room.max_y:
-                    y = y + 1
-            elif dir == 3:
-                if x > 0:
-                    x = x - 1
-
-            if (x, y) == room.vac_pos:  # tried to go beyond room
-                print(f"dir={dir}  BLOCKED: WALL")
-            elif (x, y) in room.block_tiles_set:
-                print(f"dir={dir} BLOCKED: FURNITURE")
-            else:
-                room.vac_pos = (x, y)  # update vacuum position
-                room.add_clean_pos(room.vac_pos)  # track new clean tile
-                draw_all_tiles(room)
-
-            # draw vacuum
-            draw_vac(room)
-
-            pygame.display.flip()
-            pygame.display.update()
+    # delay_time / fps parameters
+    sim_thread = SimulationThread(sim, delay_time)
+    sim_thread.start()
+    clock = pygame.time.Clock()
+
+    # RENDER LOOP ---------
+    done = False
+    while not done:
+        # REQUIRED for PyGame - close window,stop game
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                sim_thread.stop()
+                pygame.quit()
+                sys.exit()
+
+        vac_pos, cleaned, done = sim_thread.snapshot()
+        renderer.update(vac_pos, cleaned)  # redraws changed tiles only
+        clock.tick(fps)
+
+    # game over
+    move_count = sim.move_count
+    result_str = " SUCCESS!"
+    if move_count > max_cycles:
+        result_str = " OUT OF TIME"
+    print(
+        f"--------------------------------------\n"
+        f"RESULTS ***** {result_str}\n"
+        f"{robo_vac.name} ID={robo_vac.id} {get_date_time()}"
+        f"\nLevel: {room.game_level}  Coverage: "
+        f"{((room.clean_count/room.max_tiles)*100):.1f}%\n"
+        f"Cycles: {move_count} Tiles Cleaned: "
+        f"{room.clean_count} Max Tiles: {room.max_tiles}"
+        f"Total Tiles {room.max_tiles}\n"
+        f"Efficiency: {(room.max_tiles/move_count):.2f}"
+    )
+    # one line summary, same format as the old log.txt
+    result_str = (
+        f"{get_date_time()} {robo_vac.id}"
+        f" {robo_vac.name} "
+        f" L{room.game_level} "
+        f"Coverage:{((room.clean_count/room.max_tiles)):.2f} "
+        f"Eff:{(room.max_tiles/move_count):.2f}\n"
+    )
+    print(result_str)
+    if stats:
+        print(sim.instruments.report())
+    # results to the results store (python ResultsStore.py summary)
+    results = sim.results()
+    results["controller"] = type(robo_vac).__module__
+    results["player_id"] = robo_vac.id
+    results["player_name"] = robo_vac.name
+    results["max_cycles"] = max_cycles
+    with ResultsStore() as store:
+        store.add(results, source="game")
+    return results
+
+
+def main(game_level, delay_time=100, fps=30, stats=False, log_level=None):
+    """
+    Plays one game (see play) and exits
+    log_level: print events from this EventLog level up, e.g. INFO for
+               move counts and bumps, DEBUG to add the RoboVac's own
+    """
+    if log_level is not None:
+        default_log().enable(log_level, print_sink)
 
-            # CONTROLS GAME SPEED
-            pygame.time.delay(delay_time)
-
-            # REQUIRED for PyGame - close window,stop game
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
+    play(game_level, delay_time, fps, stats)
+
+    pygame.quit()
+    sys.exit()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,304 @@
+"""
+    Replay - record episodes as compact binary traces and play them back
+    A trace holds the level, the seed the episode was played with, the
+    room layout and starting vac_pos, then one 2-bit direction code per
+    tick and the ticks whose move was blocked (wall or furniture) as
+    varint gaps. Built-in levels store only their size, so a 400 tick
+    game comes to a little over 100 bytes.
+
+    Replay decodes a trace into the vacuum position at every tick and
+    keeps a coverage keyframe every keyframe_interval ticks; any frame is
+    rebuilt from the nearest keyframe without replaying from tick 0.
+
+    usage: python Replay.py trace.rvt [--tick N]
+"""
+
+import argparse
+
+import numpy as np
+
+from Grid import CLEAN
+from Room import Room, level_blocks
+from Simulator import MOVED
+
+MAGIC = b"RVT1"
+
+# header flags
+BUILTIN_BLOCKS = 1  # block list is level_blocks(level), not stored
+
+# packed byte -> its 4 direction codes, lowest bits first
+UNPACK = [bytes((b & 3, b >> 2 & 3, b >> 4 & 3, b >> 6)) for b in range(256)]
+
+
+# Varints ------
+def write_varint(out, value):
+    # unsigned LEB128
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, i):
+    """
+    Returns (value, index after the varint)
+    """
+    value = shift = 0
+    while True:
+        b = data[i]
+        i += 1
+        value |= (b & 0x7F) << shift
+        if b < 0x80:
+            return value, i
+        shift += 7
+
+
+def pack_dirs(dirs):
+    # 4 direction codes per byte, first tick in the lowest bits
+    dirs = bytes(dirs) + bytes(-len(dirs) % 4)
+    return bytes(
+        a | b << 2 | c << 4 | d << 6
+        for a, b, c, d in zip(dirs[0::4], dirs[1::4], dirs[2::4], dirs[3::4])
+    )
+
+
+def unpack_dirs(packed, count):
+    return bytearray(b"".join(map(UNPACK.__getitem__, packed))[:count])
+
+
+class Trace:
+    def __init__(self, level, layout, seed=""):
+        """
+        level: game level the episode was played on
+        layout: (room_width, room_height, block_list, vac_pos) of the room
+        seed: whatever the episode was seeded with, kept as text
+        """
+        self.level = level
+        self.width, self.height, block_list, vac_pos = layout
+        self.block_list = [tuple(b) for b in block_list]
+        self.vac_pos = tuple(vac_pos)
+        self.seed = str(seed)
+        self.dirs = bytearray()  # one direction code 0-3 per tick
+        self.blocked = []  # ticks (index into dirs) whose move was blocked
+
+    def __len__(self):
+        return len(self.dirs)
+
+    def add(self, dir, blocked):
+        if blocked:
+            self.blocked.append(len(self.dirs))
+        # a blocked move leaves the vacuum in place whatever its code
+        self.dirs.append(dir & 3)
+
+    def layout(self):
+        # for Room(trace.level, trace.layout())
+        return (self.width, self.height, list(self.block_list), self.vac_pos)
+
+    def to_bytes(self):
+        out = bytearray(MAGIC)
+        builtin = self.block_list == level_blocks(self.level)
+        for value in (self.level, self.width, self.height,
+                      BUILTIN_BLOCKS if builtin else 0):
+            write_varint(out, value)
+        if not builtin:
+            write_varint(out, len(self.block_list))
+            for block in self.block_list:
+                for value in block:
+                    write_varint(out, value)
+        write_varint(out, self.vac_pos[0])
+        write_varint(out, self.vac_pos[1])
+        seed = self.seed.encode()
+        write_varint(out, len(seed))
+        out += seed
+        write_varint(out, len(self.dirs))
+        out += pack_dirs(self.dirs)
+        write_varint(out, len(self.blocked))
+        previous = -1
+        for tick in self.blocked:
+            write_varint(out, tick - previous - 1)
+            previous = tick
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a RoboVac trace")
+        i = len(MAGIC)
+        values = []
+        for _ in range(4):
+            value, i = read_varint(data, i)
+            values.append(value)
+        level, width, height, flags = values
+        if flags & BUILTIN_BLOCKS:
+            block_list = level_blocks(level)
+        else:
+            count, i = read_varint(data, i)
+            block_list = []
+            for _ in range(count):
+                block = []
+                for _ in range(4):
+                    value, i = read_varint(data, i)
+                    block.append(value)
+                block_list.append(tuple(block))
+        x, i = read_varint(data, i)
+        y, i = read_varint(data, i)
+        length, i = read_varint(data, i)
+        seed = bytes(data[i:i + length]).decode()
+        i += length
+
+        trace = cls(level, (width, height, block_list, (x, y)), seed)
+        ticks, i = read_varint(data, i)
+        end = i + (ticks + 3) // 4
+        trace.dirs = unpack_dirs(data[i:end], ticks)
+        count, i = read_varint(data, end)
+        tick = -1
+        for _ in range(count):
+            gap, i = read_varint(data, i)
+            tick += gap + 1
+            trace.blocked.append(tick)
+        return trace
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class Recorder:
+    """
+    Wraps a Simulator and records every move it plays into a Trace
+    """
+
+    def __init__(self, sim, seed=""):
+        self.sim = sim
+        room = sim.room
+        self.trace = Trace(
+            room.game_level,
+            (room.max_width, room.max_height, room.block_list, room.vac_pos),
+            seed,
+        )
+
+    def step(self):
+        result = self.sim.step()
+        self.trace.add(self.sim.last_dir, result != MOVED)
+        return result
+
+    def run(self):
+        # GAME LOOP ---------
+        while not self.sim.is_done():
+            self.step()
+        return self.sim.results()
+
+
+class Replay:
+    def __init__(self, trace, keyframe_interval=64):
+        self.trace = trace
+        self.keyframe_interval = keyframe_interval
+        width = trace.width
+        x, y = trace.vac_pos
+
+        # flat tile index (y * width + x) of the vacuum after every tick,
+        # positions[0] being the start; clean_counts likewise
+        offsets = (-width, 1, width, -1)
+        blocked = bytearray(len(trace) + 1)
+        for tick in trace.blocked:
+            blocked[tick] = 1
+        pos = y * width + x
+        clean = bytearray(width * trace.height)
+        clean[pos] = 1
+        count = 1
+        self.positions = [pos]
+        self.clean_counts = [count]
+        # keyframes[k] is the coverage bitmap after tick k * keyframe_interval
+        self.keyframes = [bytes(clean)]
+        for tick, dir in enumerate(trace.dirs):
+            if not blocked[tick]:
+                pos += offsets[dir]
+                if not clean[pos]:
+                    clean[pos] = 1
+                    count += 1
+            self.positions.append(pos)
+            self.clean_counts.append(count)
+            if (tick + 1) % keyframe_interval == 0:
+                self.keyframes.append(bytes(clean))
+
+    def __len__(self):
+        return len(self.trace)
+
+    def vac_pos(self, tick):
+        return divmod(self.positions[tick], self.trace.width)[::-1]
+
+    def clean_count(self, tick):
+        return self.clean_counts[tick]
+
+    def seek(self, tick):
+        """
+        Returns (vac_pos, clean) after tick moves; clean is a bytearray
+        with 1 for every tile cleaned so far, tile (x, y) at y * width + x
+        """
+        tick = max(0, min(tick, len(self)))
+        k = tick // self.keyframe_interval
+        clean = bytearray(self.keyframes[k])
+        for pos in self.positions[k * self.keyframe_interval + 1:tick + 1]:
+            clean[pos] = 1
+        return self.vac_pos(tick), clean
+
+    def room(self, tick):
+        """
+        Returns a Room in the state it had after tick moves,
+        e.g. for drawing with PygameRoboVac
+        """
+        tick = max(0, min(tick, len(self)))
+        vac_pos, clean = self.seek(tick)
+        room = Room(self.trace.level, self.trace.layout())
+        cleaned = np.frombuffer(clean, dtype=np.uint8).astype(bool)
+        room.grid.cells.reshape(-1)[cleaned] |= CLEAN
+        room.vac_pos = vac_pos
+        room.clean_count = self.clean_counts[tick]
+        return room
+
+    def render(self, tick):
+        # text picture of a frame: # block, V vacuum, . clean, - dirty
+        vac_pos, clean = self.seek(tick)
+        room = Room(self.trace.level, self.trace.layout())
+        width = self.trace.width
+        rows = []
+        for y in range(self.trace.height):
+            row = []
+            for x in range(width):
+                if (x, y) == vac_pos:
+                    row.append("V")
+                elif room.is_block((x, y)):
+                    row.append("#")
+                else:
+                    row.append("." if clean[y * width + x] else "-")
+            rows.append("".join(row))
+        return "\n".join(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("trace", help="trace file written by Trace.save")
+    parser.add_argument("--tick", type=int, default=None,
+                        help="frame to show (default: the last one)")
+    args = parser.parse_args(argv)
+
+    trace = Trace.load(args.trace)
+    replay = Replay(trace)
+    tick = len(replay) if args.tick is None else args.tick
+    tick = max(0, min(tick, len(replay)))
+    room = replay.room(tick)
+    print(f"Level: {trace.level}  Seed: {trace.seed}  "
+          f"Room: {trace.width}x{trace.height}  Start: {trace.vac_pos}")
+    print(f"Tick: {tick}/{len(replay)}  Blocked: "
+          f"{sum(1 for t in trace.blocked if t < tick)}  "
+          f"Coverage: {room.clean_count / room.max_tiles:.2f}")
+    print(replay.render(tick))
+
+
+if __name__ == "__main__":
+    main()
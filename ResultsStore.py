@@ -0,0 +1,238 @@
+"""
+    ResultsStore - episode results in an SQLite database
+    One row per episode with seed, level, room size, cycles, tiles
+    cleaned, wall / furniture bumps and get_next_move timing. The
+    database runs in WAL mode, so several tournaments can append while
+    others read. Rows are written in batches, one transaction per batch.
+    The store is append-only: an episode played again is a new row.
+    Replaces the free-text log.txt; old log.txt lines can be imported.
+
+    usage: python ResultsStore.py summary [--controller RoboVac1] [--level 5]
+           python ResultsStore.py import log.txt
+"""
+
+import argparse
+import datetime
+import os
+import re
+import sqlite3
+
+DEFAULT_PATH = "results.db"
+
+# columns of the episodes table besides id, in insert order
+COLUMNS = (
+    "recorded", "source", "controller", "player_id", "player_name",
+    "level", "seed", "room", "width", "height", "max_cycles",
+    "success", "coverage", "cycles", "tiles_cleaned", "max_tiles",
+    "efficiency", "wall_bumps", "furniture_bumps",
+    "move_seconds", "max_move_seconds", "seconds", "log_line",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS episodes (
+    id INTEGER PRIMARY KEY,
+    recorded TEXT,          -- local time the episode finished
+    source TEXT,            -- tournament, game or log.txt
+    controller TEXT,        -- module / file name (player name for log.txt)
+    player_id TEXT,
+    player_name TEXT,
+    level INTEGER,
+    seed INTEGER,           -- NULL when played on the global random state
+    room TEXT NOT NULL DEFAULT '',  -- RoomGenerators spec, '' = built-in
+    width INTEGER,
+    height INTEGER,
+    max_cycles INTEGER,
+    success INTEGER,
+    coverage REAL,
+    cycles INTEGER,
+    tiles_cleaned INTEGER,
+    max_tiles INTEGER,
+    efficiency REAL,
+    wall_bumps INTEGER,
+    furniture_bumps INTEGER,
+    move_seconds REAL,      -- total time in get_next_move
+    max_move_seconds REAL,  -- slowest get_next_move call
+    seconds REAL,           -- whole episode, room set up included
+    log_line INTEGER        -- line number for rows imported from log.txt
+);
+-- unique keys of older databases: episode_key replaced re-runs,
+-- episode_log_line and episode_source_line clashed between log files
+DROP INDEX IF EXISTS episode_key;
+DROP INDEX IF EXISTS episode_log_line;
+DROP INDEX IF EXISTS episode_source_line;
+CREATE INDEX IF NOT EXISTS episode_lookup
+    ON episodes (controller, level, seed, room, max_cycles);
+-- an imported log line is known by its number and everything it says,
+-- whatever file it came from (other rows have no log_line)
+CREATE UNIQUE INDEX IF NOT EXISTS episode_log_entry
+    ON episodes (log_line, recorded, player_id, player_name, level,
+                 coverage, efficiency);
+"""
+
+# 2023-09-24 18:14 66666666 Zarkon Zeeblebrock  L0 Coverage:1.00 Eff:0.98
+LOG_LINE = re.compile(
+    r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}) (\S+) (.*?)\s+L(\d+) "
+    r"Coverage:([\d.]+) Eff:([\d.]+)"
+)
+
+
+class ResultsStore:
+    def __init__(self, path=DEFAULT_PATH, batch_size=500):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = []
+        # wait for other writers instead of failing with "database is locked"
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, results, source="tournament"):
+        """
+        Queues one results DICT (see Simulator.results and
+        Tournament.run_episode); written once batch_size rows are queued
+        """
+        row = dict(results)
+        row.setdefault("recorded", datetime.datetime.now().isoformat(" ", "seconds"))
+        row.setdefault("source", source)
+        row.setdefault("room", "")
+        self.pending.append(tuple(row.get(column) for column in COLUMNS))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        # append only: a seed played again is kept as a new row
+        with self.db:
+            self.db.executemany(
+                f"INSERT INTO episodes ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                self.pending,
+            )
+        self.pending = []
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    def evaluated(self, controller, room="", max_cycles=400):
+        """
+        Returns SET of (level, seed) already stored for a controller
+        """
+        rows = self.db.execute(
+            "SELECT level, seed FROM episodes WHERE controller = ? AND room = ? "
+            "AND max_cycles = ? AND seed IS NOT NULL",
+            (controller, room, max_cycles),
+        )
+        return set(rows)
+
+    def summary(self, controller=None, level=None):
+        """
+        Aggregates stored episodes per (controller, level)
+        Returns DICT {(controller, level): {stat: value}}; stats a row
+        source does not record (cycles of log.txt lines) are None
+        """
+        where = []
+        params = []
+        if controller is not None:
+            where.append("controller = ?")
+            params.append(controller)
+        if level is not None:
+            where.append("level = ?")
+            params.append(level)
+        query = (
+            "SELECT controller, level, COUNT(*), AVG(success), AVG(coverage), "
+            "AVG(cycles), AVG(efficiency), MIN(efficiency), MAX(efficiency), "
+            "AVG(wall_bumps), AVG(furniture_bumps), "
+            "SUM(move_seconds) / SUM(cycles - 5) "
+            "FROM episodes "
+            + (f"WHERE {' AND '.join(where)} " if where else "")
+            + "GROUP BY controller, level ORDER BY controller, level"
+        )
+        stats = ("episodes", "success", "coverage", "cycles", "efficiency",
+                 "min_efficiency", "max_efficiency", "wall_bumps",
+                 "furniture_bumps", "move_seconds")
+        return {
+            (row[0], row[1]): dict(zip(stats, row[2:]))
+            for row in self.db.execute(query, params)
+        }
+
+    def import_log(self, path="log.txt"):
+        """
+        Adds the lines of an old log.txt; a line imported before (same
+        line number and contents, from this or any other file, e.g. an
+        earlier copy of a log that has grown since) is skipped.
+        Returns the number of rows added
+        """
+        before = self.db.total_changes
+        rows = []
+        with open(path) as f:
+            for line_number, line in enumerate(f, 1):
+                match = LOG_LINE.match(line.strip())
+                if match is None:
+                    continue
+                recorded, player_id, name, level, coverage, efficiency = match.groups()
+                rows.append((recorded, os.path.basename(path), name, player_id,
+                             name, int(level), float(coverage), float(efficiency),
+                             line_number))
+        with self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO episodes (recorded, source, controller, "
+                "player_id, player_name, level, coverage, efficiency, log_line) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return self.db.total_changes - before
+
+
+def format_summary(summary):
+    def number(value, spec):
+        return "-".rjust(int(spec.split(".")[0])) if value is None else format(value, spec)
+
+    lines = [
+        f"{'controller':<20} {'level':>5} {'runs':>6} {'success':>8} "
+        f"{'coverage':>8} {'cycles':>7} {'eff':>5} {'min':>5} {'max':>5} "
+        f"{'walls':>6} {'furn':>6} {'us/move':>8}"
+    ]
+    for (controller, level), s in summary.items():
+        move_us = None if s["move_seconds"] is None else s["move_seconds"] * 1e6
+        lines.append(
+            f"{controller:<20} {level:>5} {s['episodes']:>6} "
+            f"{number(s['success'], '8.2f')} {number(s['coverage'], '8.2f')} "
+            f"{number(s['cycles'], '7.1f')} {number(s['efficiency'], '5.2f')} "
+            f"{number(s['min_efficiency'], '5.2f')} "
+            f"{number(s['max_efficiency'], '5.2f')} "
+            f"{number(s['wall_bumps'], '6.1f')} "
+            f"{number(s['furniture_bumps'], '6.1f')} {number(move_us, '8.1f')}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("--db", default=DEFAULT_PATH,
+                        help=f"database file (default {DEFAULT_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    summary = commands.add_parser("summary", help="results per controller and level")
+    summary.add_argument("--controller")
+    summary.add_argument("--level", type=int)
+    log = commands.add_parser("import", help="add the lines of an old log.txt")
+    log.add_argument("log", nargs="?", default="log.txt")
+    args = parser.parse_args(argv)
+
+    with ResultsStore(args.db) as store:
+        if args.command == "summary":
+            print(format_summary(store.summary(args.controller, args.level)))
+        else:
+            print(f"{store.import_log(args.log)} runs imported from {args.log}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,80 +9,91 @@ goal: visit all tiles
 exec will : create instance and in game loop call : nextMove()  ??
 """
 import random
-from queue import PriorityQueue
+
+from Adjacency import DIRECTIONS, Adjacency
+from EventLog import CONFIG_BLOCK, DEBUG, default_log
+from Grid import BLOCK, Grid
+from UnvisitedIndex import UnvisitedIndex
 
 
 class RoboVac:
-    def __init__(self, config_list):
+    def __init__(self, config_list, rng=None):
         self.room_width, self.room_height = config_list[0]
         self.pos = config_list[1]  # starting position of vacuum
         self.block_list = config_list[2]  # blocks list (x,y,width,ht)
 
-        self.obstacles = set()
+        # obstacles: grid with all block tiles flagged BLOCK
+        self.obstacles = Grid(self.room_width, self.room_height)
+        # diagnostics (off unless enabled, see EventLog)
+        self.events = default_log()
         self.current_pos = (self.pos[0], self.pos[1])
-        self.unvisited_blocks = set()
+        # unvisited blocks: bitset rows, also the spatial index for the heuristic
+        self.unvisited_blocks = UnvisitedIndex(self.room_width, self.room_height)
         # Record coordinates for all blocks(obstacles)
         for block in self.block_list:
-            print(block)
+            self.events.emit(DEBUG, CONFIG_BLOCK, block)
             self.add_obstacle(block)
-        self.priority_queue = PriorityQueue()
         self.initialize_unvisited_blocks()
 
+        # adjacency: legal moves of every tile (inside the room, not into
+        # an obstacle), smallest neighbour tile first so ties on priority
+        # go to the smallest tile
+        self.adjacency = Adjacency.from_grid(self.obstacles)
+
         self.loop_avoider = {}
 
+        # random source for tie breaks; a random.Random makes runs
+        # reproducible, default is the global random module
+        self.rng = random if rng is None else rng
+
         # fill in with your info
         self.name = "Sanjee Yogeswaran"
         self.id = "47514289"
 
     def initialize_unvisited_blocks(self):
-        # Initialize the set of unvisited blocks
-        for x in range(self.room_width):
-            for y in range(self.room_height):
-                if (x, y) not in self.obstacles:
-                    self.unvisited_blocks.add((x, y))
+        # Initialize the set of unvisited blocks: every tile that is not an obstacle
+        self.unvisited_blocks.set_rows(self.obstacles.row_bits(BLOCK, False))
+
+    def visit(self, position):
+        # Remove a block from the set of unvisited blocks
+        self.unvisited_blocks.discard(position)
 
     def add_obstacle(self, obstacle):
-        # Add an obstacle to the set of obstacles
-        x, y, width, height = obstacle
-        for i in range(x, x + width):
-            for j in range(y, y + height):
-                self.obstacles.add((i, j))
+        # Add an obstacle (x, y, width, height) to the obstacle grid
+        self.obstacles.add_rect(obstacle, BLOCK)
 
     def heuristic(self, position):
         # Heuristic: Manhattan distance to the closest unvisited block
-        min_distance = float("inf")
-        for block in self.unvisited_blocks:
-            distance = abs(position[0] - block[0]) + abs(position[1] - block[1])
-            min_distance = min(min_distance, distance)
-        return min_distance
+        # (inf once every block has been visited)
+        return self.unvisited_blocks.distance(position)
 
     def get_next_move(self, current_pos):
-        # Define possible directions: north, east, south, west
-        directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
-
-        # Create a priority queue for A* search
-        priority_queue = PriorityQueue()
-
-        for dx, dy in directions:
-            next_x = current_pos[0] + dx
-            next_y = current_pos[1] + dy
-
-            # Check if the next position is within the grid boundaries
-            if 0 <= next_x <= self.room_width and 0 <= next_y < self.room_height:
-                next_pos = (next_x, next_y)
-
-                # Check if the next position is not an obstacle
-                if next_pos not in self.obstacles:
-                    # Calculate the priority based on the heuristic
-                    priority = self.heuristic(next_pos)
-                    priority_queue.put((priority, next_pos, directions.index((dx, dy))))
+        directions = DIRECTIONS
+        moves = self.adjacency.moves(current_pos)
+
+        # A* step: the neighbour with the lowest heuristic, smallest tile
+        # first on ties. An unvisited neighbour scores 0, which nothing
+        # beats, so the first one found wins without computing distances
+        best = None
+        for move in moves:
+            if move[0] in self.unvisited_blocks:
+                best = move
+                break
+        else:
+            best_priority = None
+            for move in moves:
+                # Calculate the priority based on the heuristic
+                priority = self.heuristic(move[0])
+                if best is None or priority < best_priority:
+                    best = move
+                    best_priority = priority
 
         # Choose the cell with the highest priority (based on the heuristic)
-        if not priority_queue.empty():
-            _, next_pos, direction = priority_queue.get()
+        if best is not None:
+            next_pos, direction, _ = best
             # Remove the visited block from the set of unvisited blocks
             if next_pos in self.unvisited_blocks:
-                self.unvisited_blocks.remove(next_pos)
+                self.visit(next_pos)
 
             if next_pos not in self.loop_avoider:
                 self.loop_avoider[next_pos] = 1
@@ -90,9 +101,9 @@ class RoboVac:
                 self.loop_avoider[next_pos] += 1
 
             if self.loop_avoider[next_pos] >= 4:
-                return directions.index(random.choice(directions))
+                return directions.index(self.rng.choice(directions))
 
             return direction
 
         # If no valid move is found, stay in the current position (backtrack)
-        return directions.index(random.choice(directions))
+        return directions.index(self.rng.choice(directions))
@@ -8,19 +8,51 @@ main creates an instance of RoboVac (your code) and provides:
 goal: visit all tiles
 exec will : create instance and in game loop call : nextMove()  ??
 """
+import heapq
+import itertools
 import random
-from queue import PriorityQueue
+
+from Adjacency import DIRECTIONS, Adjacency
+from EventLog import (DEBUG, LOOP_ACTIVATED, LOOP_DIRECTION, OBSTACLE, RANDOM_MOVE,
+                      SEEK_TARGET, default_log)
+from UnvisitedIndex import UnvisitedIndex
+
+# what decided the last move (last_mode); counted by Instrumentation
+ASTAR = "astar"  # normal A* step to an adjacent unvisited block
+SEEK = "seek"  # seek mode towards a corner or random unvisited block
+LOOP_QUEUE = "loop_queue"  # queued loop avoider move
+LOOP_AVOIDER = "loop_avoider"  # loop avoider picked a random direction
+RANDOM = "random"  # main random fallback
 
 
 class RoboVac:
-    def __init__(self, config_list):
+    def __init__(self, config_list, geodesic_seek=True, rng=None,
+                 seek_threshold=8, loop_threshold=4, escape_run=3):
+        """
+        seek_threshold: consecutive moves over visited blocks before seek
+                        mode starts, or picks a new target
+        loop_threshold: visits to a block before the loop avoider takes over
+        escape_run: blocks the loop avoider queues in its random direction
+        (defaults are the hand tuned values; see Autotune)
+        """
         self.room_width, self.room_height = config_list[0]
         self.pos = config_list[1]  # starting position of vacuum
         self.current_pos = (self.pos[0], self.pos[1])
 
-        self.obstacles = set()
-        self.unvisited_blocks = set()
-        self.priority_queue = PriorityQueue()
+        # Adjacency: legal directions of every tile; walls from the start,
+        # obstacles are blocked in place as RoboVac bumps into them.
+        # Its neighbour lists are ordered by position, so ties on priority
+        # go to the smallest position
+        self.adjacency = Adjacency(self.room_width, self.room_height)
+        # Coordinates (x, y) of all four corners
+        self.corners = [
+            (0, 0),
+            (0, self.room_height - 1),
+            (self.room_width - 1, 0),
+            (self.room_width - 1, self.room_height - 1),
+        ]
+        # Unvisited blocks: one bit per block
+        self.unvisited_blocks = UnvisitedIndex(self.room_width, self.room_height)
         # Creates unvisited blocks set; adds every block in grid to set
         self.initialize_unvisited_blocks()
 
@@ -36,6 +68,17 @@ class RoboVac:
         # visited already visited blocks
         self.consecutive_visited = 0
 
+        # Tuning constants
+        self.seek_threshold = seek_threshold
+        self.loop_threshold = loop_threshold
+        self.escape_run = escape_run
+
+        # Events: diagnostics, off unless enabled (see EventLog)
+        self.events = default_log()
+
+        # Last Mode: which part of get_next_move chose the last direction
+        self.last_mode = None
+
         # Seek Mode: sets mode to seek a corner or random unvisited block
         self.seek_mode = False
 
@@ -43,10 +86,22 @@ class RoboVac:
         self.next_unvisited = (-1, -1)
 
         # Loop avoider queue: used to move RoboVac in certain direction multiple times
-        self.loop_avoider_queue = PriorityQueue()
+        # heapq list of (priority, position, direction)
+        self.loop_avoider_queue = []
+
+        # Geodesic Seek: seek mode follows BFS distance maps around known
+        # obstacles instead of Manhattan distance plus the loop avoider
+        self.geodesic_seek = geodesic_seek
+
+        # Distance Maps: cache of BFS distance maps
+        # (key: seek target, value: list of moves to target by tile index,
+        # -1 if unreachable); cleared whenever a new obstacle is discovered
+        self.distance_maps = {}
 
-        # Adds positions of all walls to obstacle list
-        self.initialize_walls()
+        # Random source for seek targets and loop avoider directions;
+        # a random.Random makes runs reproducible, default is the global
+        # random module
+        self.rng = random if rng is None else rng
 
         # fill in with your info
         self.name = "Sanjee Yogeswaran"
@@ -56,31 +111,15 @@ class RoboVac:
     # Creates a set with all blocks in the grid given width and height
     ########################################################################
     def initialize_unvisited_blocks(self):
-        # Initialize the set of unvisited blocks
-        for x in range(self.room_width):
-            for y in range(self.room_height):
-                self.unvisited_blocks.add((x, y))
-
-    def initialize_walls(self):
-        for x in range(self.room_width):
-            self.obstacles.add((x, self.room_height))
-            self.obstacles.add((x, -1))
-
-        for y in range(self.room_height):
-            self.obstacles.add((-1, y))
-            self.obstacles.add((self.room_width, y))
+        # Initialize the set of unvisited blocks: every row full
+        full_row = (1 << self.room_width) - 1
+        self.unvisited_blocks.set_rows([full_row] * self.room_height)
 
     ########################################################################
-    # A* heuristic using Manhattan distance
-    # This algorithm checks against all unvisited blocks
+    # Marks a block as visited
     ########################################################################
-    def heuristic(self, position):
-        # Heuristic: Manhattan distance to the closest unvisited block
-        min_distance = float("inf")
-        for block in self.unvisited_blocks:
-            distance = abs(position[0] - block[0]) + abs(position[1] - block[1])
-            min_distance = min(min_distance, distance)
-        return min_distance
+    def visit(self, position):
+        self.unvisited_blocks.discard(position)
 
     ########################################################################
     # Modified heuristic using Manhattan distance
@@ -94,32 +133,108 @@ class RoboVac:
         )
         return distance
 
-    def get_next_move(self, current_pos):
-        # Define possible directions: north, east, south, west
-        directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+    ########################################################################
+    # BFS distance map to a target block
+    # Distances are true shortest paths around all known obstacles;
+    # unknown blocks are assumed to be free. Maps are cached per target
+    ########################################################################
+    def distance_map(self, target_block):
+        if target_block not in self.distance_maps:
+            self.distance_maps[target_block] = self.adjacency.distances(target_block)
+        return self.distance_maps[target_block]
 
-        # Define coordinates for all four corners
-        corners = [
-            (0, 0),
-            (0, self.room_width - 1),
-            (self.room_height - 1, 0),
-            (self.room_width - 1, self.room_height - 1),
-        ]
+    ########################################################################
+    # Picks a corner or random unvisited block to seek
+    # With geodesic seek only targets reachable from current_pos
+    # (around known obstacles) are picked
+    ########################################################################
+    def pick_seek_target(self, corners, current_pos):
+        self.next_unvisited = (-1, -1)
+        if not self.geodesic_seek:
+            for corner in self.rng.sample(corners, 4):
+                if corner in self.unvisited_blocks:
+                    self.next_unvisited = corner
+            # (none left when blocks were marked visited on a blocked move)
+            if self.next_unvisited == (-1, -1) and self.unvisited_blocks:
+                self.next_unvisited = self.unvisited_blocks.choice(self.rng)
+            return self.next_unvisited
+
+        for corner in self.rng.sample(corners, 4):
+            if corner in self.unvisited_blocks and self.is_reachable(
+                corner, current_pos
+            ):
+                self.next_unvisited = corner
+        if self.next_unvisited == (-1, -1) and self.unvisited_blocks:
+            # a few random picks, then the first reachable block in order
+            blocks = [self.unvisited_blocks.choice(self.rng) for _ in range(8)]
+            for block in itertools.chain(blocks, self.unvisited_blocks):
+                if self.is_reachable(block, current_pos):
+                    self.next_unvisited = block
+                    break
+        return self.next_unvisited
+
+    def is_reachable(self, target_block, current_pos):
+        return self.distance_map(target_block)[self.adjacency.index(current_pos)] >= 0
+
+    ########################################################################
+    # Geodesic seek mode: move along the BFS distance map to the target
+    # Returns direction, or -1 if there is no reachable target
+    ########################################################################
+    def geodesic_seek_move(self, current_pos, corners):
+        # New target if the old one turned out to be an obstacle
+        # or is cut off by obstacles
+        if not self.is_reachable(self.next_unvisited, current_pos):
+            if self.pick_seek_target(corners, current_pos) == (-1, -1):
+                self.seek_mode = False
+                return -1
+        self.events.emit(DEBUG, SEEK_TARGET, self.next_unvisited)
+        distances = self.distance_map(self.next_unvisited)
+
+        # Lowest distance wins, smallest position on ties
+        best = best_priority = None
+        for move in self.adjacency.moves(current_pos):
+            next_pos, _, next_index = move
+            if distances[next_index] >= 0:
+                # Adjacent unvisited block: priority 0, move there
+                if next_pos in self.unvisited_blocks:
+                    priority = 0
+                else:
+                    priority = distances[next_index]
+                if best is None or priority < best_priority:
+                    best = move
+                    best_priority = priority
+
+        next_pos, direction, _ = best
+        # Turn off seek mode if RoboVac hits an unvisited block
+        if next_pos in self.unvisited_blocks:
+            self.visit(next_pos)
+            self.consecutive_visited = 0
+            self.seek_mode = False
+        else:
+            self.consecutive_visited += 1
+        self.prev_direction = direction
+        self.last_mode = SEEK
+        return direction
+
+    def get_next_move(self, current_pos):
+        directions = DIRECTIONS
+        corners = self.corners
 
         # Loop avoider queue algorithm
-        # RoboVac moves up to 4 times in a certain direction to avoid obstacles
-        if not self.loop_avoider_queue.empty():
-            priority, next_pos, direction = self.loop_avoider_queue.get()
+        # RoboVac moves up to escape_run + 1 times in a certain direction to avoid obstacles
+        if self.loop_avoider_queue:
+            priority, next_pos, direction = heapq.heappop(self.loop_avoider_queue)
             if next_pos in self.unvisited_blocks:
-                self.unvisited_blocks.remove(next_pos)
+                self.visit(next_pos)
                 self.consecutive_visited = 0
-                self.loop_avoider_queue = PriorityQueue()
+                self.loop_avoider_queue.clear()
                 self.seek_mode = False
             # Keep counter of consecutive moves to visited blocks
             else:
                 self.consecutive_visited += 1
             self.prev_pos = next_pos
             self.prev_direction = direction
+            self.last_mode = LOOP_QUEUE
             return direction
 
         # Logic if RoboVac has not moved(hit an obstacle or wall)
@@ -129,82 +244,69 @@ class RoboVac:
                 self.prev_pos[0] + directions[self.prev_direction][0],
                 self.prev_pos[1] + directions[self.prev_direction][1],
             )
-            print(f"added obstacle {obstacle}")
-            self.obstacles.add(obstacle)
+            self.events.emit(DEBUG, OBSTACLE, obstacle)
+            if self.adjacency.block(obstacle):
+                # distance maps may now route through the obstacle
+                self.distance_maps.clear()
             self.consecutive_visited += 1
 
         self.prev_pos = current_pos
 
         # If RoboVac is spending too much time on already visited blocks,
         # start seek mode for a corner or random unvisited block
-        if self.consecutive_visited >= 8 and not self.seek_mode:
+        if self.consecutive_visited >= self.seek_threshold and not self.seek_mode:
             self.consecutive_visited = 0
-            self.next_unvisited = (-1, -1)
-            for corner in random.sample(corners, 4):
-                if corner in self.unvisited_blocks:
-                    self.next_unvisited = corner
-            if self.next_unvisited == (-1, -1):
-                self.next_unvisited = random.choice(list(self.unvisited_blocks))
+            self.pick_seek_target(corners, current_pos)
             self.seek_mode = True
 
+        if self.seek_mode and self.geodesic_seek:
+            direction = self.geodesic_seek_move(current_pos, corners)
+            if direction != -1:
+                return direction
+
         ########################################################################
         # Seek mode: where a random unvisited block or corner is selected
         ########################################################################
         while self.seek_mode:
             # If RoboVac is unable to get close enough
-            # to the corner or unvisited block with 8 moves,
+            # to the corner or unvisited block with seek_threshold moves,
             # there may be an obstacle in the way;
             # pick another corner or random unvisited block
-            if self.consecutive_visited >= 8:
-                self.next_unvisited = (-1, -1)
-                for corner in random.sample(corners, 4):
-                    if corner in self.unvisited_blocks:
-                        self.next_unvisited = corner
-                if self.next_unvisited == (-1, -1):
-                    self.next_unvisited = random.choice(list(self.unvisited_blocks))
+            if self.consecutive_visited >= self.seek_threshold:
+                self.pick_seek_target(corners, current_pos)
                 # Reset consecutive counter, so that algorithm
-                # tries different coordinates every 8 moves
+                # tries different coordinates every seek_threshold moves
                 self.consecutive_visited = 0
-            print(f"seeking {self.next_unvisited}")
-            # Reset priority queue for seek mode
-            self.priority_queue = PriorityQueue()
-            # Loop through every move in all 4 directions
-            for dx, dy in directions:
-                next_x = current_pos[0] + dx
-                next_y = current_pos[1] + dy
-
-                # Check if the next position is within the grid boundaries
-                if 0 <= next_x < self.room_width and 0 <= next_y < self.room_height:
-                    next_pos = (next_x, next_y)
-
-                    ########################################################################
-                    # Heuristic calculations for seek mode
-                    ########################################################################
-                    # Check if the next position is not an obstacle
-                    if next_pos not in self.obstacles:
-                        # Calculate distance to selected corner or random unvisited block
-                        # This is a modification of the A* heuristic where
-                        # previously visited positions are allowed
-                        priority = self.heuristic2(next_pos, self.next_unvisited)
-                        self.priority_queue.put(
-                            (priority, next_pos, directions.index((dx, dy)))
-                        )
+            self.events.emit(DEBUG, SEEK_TARGET, self.next_unvisited)
+            # Lowest priority wins, smallest position on ties
+            best = best_priority = None
+            # Loop through every move in all 4 directions inside the grid
+            # (legal moves only: not into a wall or known obstacle)
+            for move in self.adjacency.moves(current_pos):
+                next_pos = move[0]
 
-                        # Also if an adjacent block that is unvisited
-                        # (heuristic function validates unvisited)
-                        # has priority(distance) == 0, move there
-                        priority = self.heuristic(next_pos)
-                        if priority == 0:
-                            self.priority_queue.put(
-                                (priority, next_pos, directions.index((dx, dy)))
-                            )
+                ########################################################################
+                # Heuristic calculations for seek mode
+                ########################################################################
+                # If an adjacent block is unvisited (heuristic distance 0),
+                # its priority is 0, so move there
+                if next_pos in self.unvisited_blocks:
+                    priority = 0
+                else:
+                    # Calculate distance to selected corner or random unvisited block
+                    # This is a modification of the A* heuristic where
+                    # previously visited positions are allowed
+                    priority = self.heuristic2(next_pos, self.next_unvisited)
+                if best is None or priority < best_priority:
+                    best = move
+                    best_priority = priority
             # Pick lowest distance to unvisited block
-            if not self.priority_queue.empty():
-                priority, next_pos, direction = self.priority_queue.get()
+            if best is not None:
+                next_pos, direction, _ = best
                 # Remove the visited block from the set of unvisited blocks
                 # Turn off seek mode if RoboVac hits an unvisited block
                 if next_pos in self.unvisited_blocks:
-                    self.unvisited_blocks.remove(next_pos)
+                    self.visit(next_pos)
                     self.consecutive_visited = 0
                     self.seek_mode = False
                 # Keep counter of consecutive moves to already visited blocks
@@ -212,7 +314,7 @@ class RoboVac:
                     self.consecutive_visited += 1
                 ########################################################################
                 # Loop avoider algorithm
-                # If the next position has been visited equal or more than 4 times,
+                # If the next position has been visited loop_threshold times or more,
                 # start moving randomly to get out of obstacle
                 ########################################################################
                 if next_pos not in self.loop_avoider:
@@ -220,18 +322,20 @@ class RoboVac:
                 else:
                     self.loop_avoider[next_pos] += 1
 
-                # Check if the next position has been visited equal or more than 4 times
-                if self.loop_avoider[next_pos] >= 4:
+                # Check if the next position has been visited loop_threshold times or more
+                if self.loop_avoider[next_pos] >= self.loop_threshold:
                     while True:
                         # pick a direction that doesn't collide with an obstacle
-                        random_direction = random.choice(directions)
+                        random_direction = self.rng.choice(directions)
                         next_pos = (
                             current_pos[0] + random_direction[0],
                             current_pos[1] + random_direction[1],
                         )
-                        if next_pos not in self.obstacles:
-                            print(
-                                f"loop avoider direction: {directions.index(random_direction)}"
+                        if self.adjacency.is_legal(
+                            current_pos, directions.index(random_direction)
+                        ):
+                            self.events.emit(
+                                DEBUG, LOOP_DIRECTION, directions.index(random_direction)
                             )
                             break
 
@@ -242,20 +346,22 @@ class RoboVac:
                         self.seek_mode = False
                     else:
                         self.consecutive_visited += 1
-                    # To avoid loops, we move RoboVac in a certain direction 3 times
-                    # by adding moves in the same direction 2 times to loop avoider queue
-                    # and returning that direction 1 time
-                    for i in range(1, 4):
+                    # To avoid loops, we move RoboVac in a certain direction:
+                    # return that direction once and queue the next
+                    # escape_run blocks in the same direction
+                    for i in range(1, self.escape_run + 1):
                         next_pos = (
                             current_pos[0] + random_direction[0] * i,
                             current_pos[1] + random_direction[1] * i,
                         )
-                        if next_pos not in self.obstacles:
-                            self.loop_avoider_queue.put(
-                                (0, next_pos, directions.index(random_direction))
+                        if self.adjacency.is_open(next_pos):
+                            heapq.heappush(
+                                self.loop_avoider_queue,
+                                (0, next_pos, directions.index(random_direction)),
                             )
                             self.loop_avoider[next_pos] = 0
-                    print("loop avoider activated")
+                    self.events.emit(DEBUG, LOOP_ACTIVATED)
+                    self.last_mode = LOOP_AVOIDER
                     return directions.index(random_direction)
                 ########################################################################
                 # End Loop Avoider Algorithm
@@ -263,6 +369,7 @@ class RoboVac:
                 # If not loop avoider,
                 # move in direction towards corner or random unvisited block
                 self.prev_direction = direction
+                self.last_mode = SEEK
                 return direction
 
         ########################################################################
@@ -271,51 +378,55 @@ class RoboVac:
         # Define normal A* search sequence here
         ########################################################################
 
-        # Reset priority queue for regular A* search
-        self.priority_queue = PriorityQueue()
-        for dx, dy in directions:
-            next_x = current_pos[0] + dx
-            next_y = current_pos[1] + dy
-
-            # Check if the next position is within the grid boundaries
-            if 0 <= next_x < self.room_width and 0 <= next_y < self.room_height:
-                next_pos = (next_x, next_y)
-
-                # Check if the next position is not an obstacle and not visited
-                # Calculate the distance(priority) based on the Manhattan distance
-                if next_pos not in self.obstacles and next_pos in self.unvisited_blocks:
-                    priority = self.heuristic(next_pos)
-                    self.priority_queue.put(
-                        (priority, next_pos, directions.index((dx, dy)))
-                    )
+        # Candidates are unvisited neighbours that are not obstacles; the
+        # heuristic (distance to the closest unvisited block) of an
+        # unvisited block is 0, so they all tie and the smallest position,
+        # i.e. the first in neighbour order, wins
+        best = None
+        for move in self.adjacency.moves(current_pos):
+            if move[0] in self.unvisited_blocks:
+                best = move
+                break
 
         # Choose the direction and next position with the lowest distance(priority)
-        if not self.priority_queue.empty():
-            priority, next_pos, direction = self.priority_queue.get()
+        if best is not None:
+            next_pos, direction, _ = best
 
             # Remove the visited block from the set of unvisited blocks
             if next_pos in self.unvisited_blocks:
-                self.unvisited_blocks.remove(next_pos)
+                self.visit(next_pos)
                 self.consecutive_visited = 0
             else:
                 self.consecutive_visited += 1
 
             self.prev_direction = direction
+            self.last_mode = ASTAR
             return direction
 
+        # With geodesic seek, go straight to seek mode instead of
+        # moving randomly when no unvisited block is adjacent
+        if self.geodesic_seek and self.unvisited_blocks:
+            self.consecutive_visited = 0
+            self.pick_seek_target(corners, current_pos)
+            self.seek_mode = True
+            direction = self.geodesic_seek_move(current_pos, corners)
+            if direction != -1:
+                return direction
+
         # If no valid move is found, pick random direction to move in
         # Random direction must not be in obstacles
         while True:
-            random_direction = directions.index(random.choice(directions))
+            random_direction = directions.index(self.rng.choice(directions))
             next_x = current_pos[0] + directions[random_direction][0]
             next_y = current_pos[1] + directions[random_direction][1]
-            if (next_x, next_y) not in self.obstacles:
+            if self.adjacency.is_legal(current_pos, random_direction):
                 break
         if (next_x, next_y) in self.unvisited_blocks:
-            self.unvisited_blocks.remove((next_x, next_y))
+            self.visit((next_x, next_y))
             self.consecutive_visited = 0
         else:
             self.consecutive_visited += 1
         self.prev_direction = random_direction
-        print("main random")
+        self.last_mode = RANDOM
+        self.events.emit(DEBUG, RANDOM_MOVE)
         return random_direction
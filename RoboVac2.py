@@ -0,0 +1,94 @@
+"""
+RoboVac that plans its whole route when it is created.
+Uses the room size and block list from the room config to build a
+boustrophedon coverage route (see CoveragePlanner); get_next_move then
+just returns the next direction of that route, get_next_moves the next
+run of it.
+If a move was blocked after all (another vacuum, see MultiVac) the
+rest of the run is dropped by the simulator; the route then rewinds to
+where the vacuum stopped, or is planned again from there if it is off
+the run altogether.
+Routes are kept in the PlanCache, so a layout seen before is not
+planned again.
+"""
+from array import array
+
+from Adjacency import DIRECTIONS
+from CoveragePlanner import plan_coverage
+from PlanCache import default_cache
+
+
+class RoboVac:
+    def __init__(self, config_list, rng=None):
+        # rng: accepted like the other controllers; planning is deterministic
+        self.room_width, self.room_height = config_list[0]
+        self.pos = config_list[1]  # starting position of vacuum
+        self.block_list = config_list[2]  # blocks list (x,y,width,ht)
+
+        # Route: every direction needed to cover the room, planned once
+        self.plan(self.pos)
+
+        # fill in with your info
+        self.name = "Sanjee Yogeswaran"
+        self.id = "47514289"
+
+    def plan(self, start):
+        start = tuple(start)
+        config_list = [(self.room_width, self.room_height), start, self.block_list]
+        self.route = array(
+            "B",
+            default_cache().get(
+                "coverage",
+                config_list,
+                lambda: plan_coverage(
+                    self.room_width, self.room_height, self.block_list, start
+                ),
+            ),
+        )
+        # index of the next direction in route, and where the vacuum
+        # should be before it
+        self.route_index = 0
+        self.route_pos = start
+        # first index and start position of the last run handed out
+        self.run_index = 0
+        self.run_pos = start
+
+    def resync(self, current_pos):
+        # rewind to the first tile of the last run the vacuum is on
+        # (replaying a loop of the run is harmless), else replan
+        current_pos = tuple(current_pos)
+        if self.route_pos is None or current_pos == self.route_pos:
+            return  # route finished, or on track
+        x, y = self.run_pos
+        for index in range(self.run_index, self.route_index):
+            if (x, y) == current_pos:
+                self.route_index = index
+                self.route_pos = current_pos
+                return
+            dx, dy = DIRECTIONS[self.route[index]]
+            x, y = x + dx, y + dy
+        self.plan(current_pos)
+
+    def hand_out(self, run):
+        # moves run along the route
+        self.run_index = self.route_index
+        self.run_pos = x, y = self.route_pos
+        for direction in run:
+            dx, dy = DIRECTIONS[direction]
+            x, y = x + dx, y + dy
+        self.route_index += len(run)
+        self.route_pos = (x, y)
+        return run
+
+    def get_next_move(self, current_pos):
+        return self.get_next_moves(current_pos, 1)[0]
+
+    def get_next_moves(self, current_pos, max_n):
+        # the next max_n directions of the route in one run; the route
+        # goes around every block, so only a vacuum can block a move
+        self.resync(current_pos)
+        if self.route_index < len(self.route):
+            return self.hand_out(self.route[self.route_index:self.route_index + max_n])
+        # route finished: every reachable tile has been visited
+        self.route_pos = None
+        return (0,)
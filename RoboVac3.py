@@ -0,0 +1,242 @@
+"""
+RoboVac that maps the room as it goes and replans incrementally.
+It starts knowing only the room size: every tile it has not bumped into
+is assumed free. The plan is a D* Lite search (Koenig & Likhachev 2002)
+run backwards from every unvisited tile at once, so g[i] is the number
+of moves from tile i to the closest unvisited tile over the map known
+so far, and get_next_move steps to the neighbour with the lowest g.
+
+Visiting a tile or bumping into an obstacle only updates the tiles
+whose distance changed, and only as far as the vacuum's own tile needs
+(queue keys carry the Manhattan distance to the vacuum plus the km
+offset for its moves since), so a move costs a few vertex updates
+rather than a fresh search of the room.
+
+get_next_moves returns the whole planned path to the closest unvisited
+tile as one run; nothing on the map changes until the vacuum gets there
+or bumps into something on the way.
+"""
+import heapq
+
+from Adjacency import Adjacency
+from EventLog import CONFIG_BLOCK, DEBUG, OBSTACLE, default_log
+from Grid import BLOCK, Grid
+
+INF = float("inf")
+
+# what decided the last move (last_mode); counted by Instrumentation
+PLAN = "plan"  # step along the current plan
+REPAIR = "repair"  # first step after a bump changed the map
+DONE = "done"  # no unvisited tile reachable on the known map
+
+
+class RoboVac:
+    def __init__(self, config_list, known_blocks=False, rng=None):
+        """
+        known_blocks: put the block list of the room config on the map up
+                      front instead of finding blocks by bumping into them
+        rng: accepted like the other controllers; planning is deterministic
+        """
+        self.room_width, self.room_height = config_list[0]
+        self.pos = config_list[1]  # starting position of vacuum
+        self.block_list = config_list[2]  # blocks list (x,y,width,ht)
+
+        # Events: diagnostics, off unless enabled (see EventLog)
+        self.events = default_log()
+
+        # Map: legal moves of every tile; walls are known from the room
+        # size, obstacles are blocked in place as they are found
+        grid = Grid(self.room_width, self.room_height)
+        if known_blocks:
+            for block in self.block_list:
+                self.events.emit(DEBUG, CONFIG_BLOCK, block)
+                grid.add_rect(block, BLOCK)
+        self.adjacency = Adjacency.from_grid(grid)
+        blocked = self.adjacency.blocked
+
+        # Goal: 1 for every tile not visited yet and not known to be blocked
+        self.goal = bytearray(1 - b for b in blocked)
+        # g: moves to the closest goal; rhs: one step lookahead of g
+        # (0 on goals, else 1 + lowest g of the neighbours). Every open
+        # tile starts as a goal, so both start at 0 and all tiles are
+        # consistent with an empty queue
+        self.g = [INF if b else 0 for b in blocked]
+        self.rhs = list(self.g)
+        # Queue: heap of (key1, key2, tile) of inconsistent tiles (g != rhs);
+        # queued holds the key of each tile's live entry, other entries
+        # of the tile are stale and skipped
+        self.queue = []
+        self.queued = {}
+        # km: sum of the heuristic offsets for vacuum moves since the
+        # search started, keeps old keys valid lower bounds
+        self.km = 0
+        # vacuum tile when km was last updated, and now
+        self.last = tuple(self.pos)
+        self.start = tuple(self.pos)
+
+        # Run Tiles: tiles the last run passes through, its start first;
+        # stopping on any but the last means the move after it was blocked
+        self.run_tiles = []
+
+        # Last Mode: which part of get_next_move chose the last direction
+        self.last_mode = None
+
+        # fill in with your info
+        self.name = "Sanjee Yogeswaran"
+        self.id = "47514289"
+
+    ########################################################################
+    # D* Lite
+    ########################################################################
+    def key(self, i):
+        g = min(self.g[i], self.rhs[i])
+        y, x = divmod(i, self.room_width)
+        return (g + abs(x - self.start[0]) + abs(y - self.start[1]) + self.km, g)
+
+    def update_vertex(self, i):
+        # (re)queue tile i if it is inconsistent, drop it if not
+        if self.g[i] != self.rhs[i]:
+            key = self.key(i)
+            if self.queued.get(i) != key:
+                self.queued[i] = key
+                heapq.heappush(self.queue, (key[0], key[1], i))
+        else:
+            self.queued.pop(i, None)
+
+    def lookahead(self, i):
+        # rhs of a tile that is not a goal: 1 + lowest g of its neighbours
+        g = self.g
+        legal = self.adjacency.legal[i]
+        best = INF
+        for d, offset in enumerate(self.adjacency.offsets):
+            if legal >> d & 1 and g[i + offset] < best:
+                best = g[i + offset]
+        return best + 1
+
+    def neighbours(self, i):
+        legal = self.adjacency.legal[i]
+        return [i + offset for d, offset in enumerate(self.adjacency.offsets)
+                if legal >> d & 1]
+
+    def top(self):
+        # (key, tile) of the live queue entry with the lowest key
+        queue = self.queue
+        while queue:
+            k1, k2, i = queue[0]
+            if self.queued.get(i) == (k1, k2):
+                return (k1, k2), i
+            heapq.heappop(queue)
+        return (INF, INF), None
+
+    def compute_shortest_path(self):
+        g = self.g
+        rhs = self.rhs
+        goal = self.goal
+        s = self.adjacency.index(self.start)
+        while True:
+            key, u = self.top()
+            if u is None or not (key < self.key(s) or rhs[s] > g[s]):
+                break
+            new_key = self.key(u)
+            if key < new_key:
+                # key grew since it was queued (the vacuum moved): requeue
+                self.queued[u] = new_key
+                heapq.heappush(self.queue, (new_key[0], new_key[1], u))
+            elif g[u] > rhs[u]:
+                # overconsistent: distance dropped, settle it
+                g[u] = rhs[u]
+                del self.queued[u]
+                for j in self.neighbours(u):
+                    if not goal[j] and g[u] + 1 < rhs[j]:
+                        rhs[j] = g[u] + 1
+                        self.update_vertex(j)
+            else:
+                # underconsistent: distance grew, reopen u and the tiles
+                # that went through it
+                g_old = g[u]
+                g[u] = INF
+                for j in self.neighbours(u) + [u]:
+                    if not goal[j] and (j == u or rhs[j] == g_old + 1):
+                        rhs[j] = self.lookahead(j)
+                    self.update_vertex(j)
+
+    ########################################################################
+    # Map changes
+    ########################################################################
+    def visit(self, i):
+        # tile i is no longer a goal
+        self.goal[i] = 0
+        self.rhs[i] = self.lookahead(i)
+        self.update_vertex(i)
+
+    def add_obstacle(self, obstacle):
+        """
+        Blocks a tile on the map and unlinks it from its neighbours;
+        returns True if it was not known before
+        """
+        adjacency = self.adjacency
+        if not adjacency.is_open(obstacle):
+            return False
+        self.events.emit(DEBUG, OBSTACLE, obstacle)
+        i = adjacency.index(obstacle)
+        neighbours = self.neighbours(i)
+        adjacency.block(obstacle)
+        self.goal[i] = 0
+        self.g[i] = self.rhs[i] = INF
+        self.queued.pop(i, None)
+        for j in neighbours:
+            if not self.goal[j]:
+                self.rhs[j] = self.lookahead(j)
+                self.update_vertex(j)
+        return True
+
+    def get_next_move(self, current_pos):
+        return self.get_next_moves(current_pos, 1)[0]
+
+    def get_next_moves(self, current_pos, max_n):
+        current_pos = tuple(current_pos)
+        self.start = current_pos
+        i = self.adjacency.index(current_pos)
+
+        # Detect obstacles on the fly if the last run stopped short
+        obstacle = None
+        if current_pos in self.run_tiles[:-1]:
+            obstacle = self.run_tiles[self.run_tiles.index(current_pos) + 1]
+        if obstacle is not None or self.goal[i]:
+            # the map changes: shift the keys to the new vacuum tile
+            self.km += (abs(current_pos[0] - self.last[0])
+                        + abs(current_pos[1] - self.last[1]))
+            self.last = current_pos
+            if obstacle is not None:
+                self.add_obstacle(obstacle)
+            if self.goal[i]:
+                self.visit(i)
+            self.compute_shortest_path()
+
+        # follow the neighbours closest to an unvisited tile (smallest
+        # tile first on ties) until one is reached; tiles on the way are
+        # visited already, so g stays valid along the whole run
+        run = []
+        self.run_tiles = [current_pos]
+        pos = current_pos
+        while len(run) < max_n:
+            best = None
+            best_g = INF
+            for move in self.adjacency.moves(pos):
+                if self.g[move[2]] < best_g:
+                    best = move
+                    best_g = self.g[move[2]]
+            if best is None:
+                break
+            pos = best[0]
+            run.append(best[1])
+            self.run_tiles.append(pos)
+            if best_g == 0:
+                break
+
+        if not run:
+            # every tile reachable on the map is clean
+            self.last_mode = DONE
+            return (0,)
+        self.last_mode = PLAN if obstacle is None else REPAIR
+        return run
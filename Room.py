@@ -0,0 +1,184 @@
+"""
+    Room - grid, furniture blocks and vacuum start position
+    No PyGame needed, so rooms can be built by headless simulations as
+    well as by PygameRoboVac. Tile state is kept in a Grid (numpy).
+"""
+
+import random
+
+from Adjacency import Adjacency
+from Grid import BLOCK, CLEAN, Grid
+
+
+def level_blocks(level):
+    """
+    Returns LIST of (x, y, width, height) blocks of a built-in level
+    """
+    # blocks - number of blocks depends on game_level
+    block_list = []
+
+    if level >= 1:
+        block_list.append((1, 2, 4, 1))
+
+    if level >= 2:
+        block_list.append((1, 2, 4, 1))
+        block_list.append((3, 2, 1, 4))
+        block_list.append((1, 2, 4, 2))
+
+    if level >= 3:
+        block_list.append((1, 2, 4, 1))
+        block_list.append((6, 6, 4, 1))
+        block_list.append((9, 6, 1, 3))
+        block_list.append((6, 8, 4, 1))
+
+    if level >= 4:
+        block_list.append((0, 8, 4, 1))
+
+    if level >= 5:
+        block_list.append((10, 10, 4, 1))
+
+    return block_list
+
+
+class Room:
+    def __init__(self, level, layout=None, rng=None):
+        """
+        level: game level 0-5 (sets the blocks of the built-in rooms)
+        layout: optional (room_width, room_height, block_list, vac_pos)
+                from a RoomGenerators generator; replaces the built-in
+                room size and blocks; vac_pos None = random start
+        rng: random.Random for window size and start position
+             (default: the global random module)
+        """
+        self.game_level = level
+        self.rng = random if rng is None else rng
+
+        # sets up room (size) with blocks and vacuum start position
+        # -Robovac is initialized with data structure containing
+        #   all room data
+        self.room_blocksize = 30
+
+        if layout is not None:
+            self.init_layout(layout)
+        else:
+            self.init_level()
+
+        # BLOCKS
+        # rasterise all blocks from block list into the grid
+        self.grid = Grid(self.max_width, self.max_height)
+        self.grid.add_rects(self.block_list, BLOCK)
+        # legal moves of every tile, for the Simulator's move check
+        self.adjacency = Adjacency.from_grid(self.grid)
+
+        if layout is not None and layout[3] is not None:
+            self.vac_pos = tuple(layout[3])
+        elif layout is not None:
+            self.vac_pos = self.random_free_pos(0, 0, self.max_width, self.max_height)
+        else:
+            # 3 tiles from the top / left edge
+            self.vac_pos = self.random_free_pos(3, 3, int(self.max_x), int(self.max_y))
+
+        # clean tiles are flagged in the grid; keep a running count
+        self.clean_count = 0
+        self.add_clean_pos(self.vac_pos)
+
+        # easily get max number of tiles that need cleaning
+        self.max_tiles = self.max_width * self.max_height - self.grid.count(BLOCK)
+
+    def init_layout(self, layout):
+        # room size and blocks from a generated layout
+        self.max_width, self.max_height, block_list, _ = layout
+        self.block_list = list(block_list)
+        self.window_width = self.max_width * self.room_blocksize
+        self.window_height = self.max_height * self.room_blocksize
+        self.max_x = self.max_width - 1
+        self.max_y = self.max_height - 1
+
+    def init_level(self):
+        # window  - varies in size
+        window_size_list = [360, 390, 420]
+        self.window_width = self.rng.choice(window_size_list)
+        self.window_height = self.rng.choice(window_size_list)
+
+        # grid max values for width and height
+        self.max_width = (int)(self.window_width / self.room_blocksize)
+        self.max_height = (int)(self.window_height / self.room_blocksize)
+        # for grid logic
+        self.max_x = (self.window_width / self.room_blocksize) - 1
+        self.max_y = (self.window_height / self.room_blocksize) - 1
+
+        # blocks - number of blocks depends on game_level
+        self.block_list = level_blocks(self.game_level)
+
+    def random_free_pos(self, x_low, y_low, x_high, y_high):
+        # vacuum random positioning, x_low <= x < x_high, y_low <= y < y_high
+        intersect = True
+        while intersect:
+            x = self.rng.randrange(x_low, x_high)
+            y = self.rng.randrange(y_low, y_high)
+            intersect = self.does_pos_intersect_blocks((x, y))
+        return (x, y)  # starting location for vacuum
+
+    def get_room_config(self):
+        """
+        Returns LIST with all the info RoboVac needs;
+              passed to RoboVac constructor
+        [ (room_width, room_height), (vac_x, vac_y) [list-of-blocks] ]
+         note: list-of-blocks is list of tuples (x,y,width, height)
+        """
+        room_config_list = [
+            (self.max_width, self.max_height),
+            self.vac_pos,
+            self.block_list,
+        ]
+        return room_config_list
+
+    # Sets with positions as tuples; built from the grid on demand
+    @property
+    def clean_set(self):
+        return self.grid.positions(CLEAN)
+
+    @property
+    def block_tiles_set(self):
+        return self.grid.positions(BLOCK)
+
+    @property
+    def free_tiles_set(self):
+        return self.grid.positions(BLOCK, False)
+
+    # Utility Methods ------
+    def add_clean_pos(self, xytuple):
+        if self.grid.set(xytuple, CLEAN):
+            self.clean_count += 1
+
+    def is_block(self, xytuple):
+        return self.grid.is_set(xytuple, BLOCK)
+
+    def rect_intersect(self, pos, rect):
+        rx, ry, width, height = rect
+        x, y = pos
+        is_intersect = x >= rx and x < (rx + width) and y >= ry and y < (ry + height)
+        return is_intersect
+
+    def does_pos_intersect_blocks(self, pos):
+        #  check all blocks
+        return self.is_block(pos)
+
+    def is_ok_next_pos(self, xytuple):
+        x, y = xytuple
+        if x < 0 & x > self.max_x & y < 0 & y > self.max_y:
+            return False
+        # check intersect with blocks
+        for rect in self.block_list:
+            rx, ry, width, height = rect
+            if x > rx & x < (rx + width) & y > ry & y < (ry + height):
+                return False
+        return True
+
+    def __str__(self):
+        return (
+            f"cpos={self.vac_pos},max_x={self.max_x} \
+        max_y={self.max_y}, window:({self.window_width}, "
+            f"{self.window_height}) \
+         blocksize={self.room_blocksize}  clean={self.clean_set}"
+        )
@@ -0,0 +1,161 @@
+"""
+    RoomGenerators - room layouts beyond the 6 built-in levels
+    A generator is a function rng -> layout, where rng is a random.Random
+    and layout is a tuple
+        (room_width, room_height, block_list, vac_pos)
+    block_list holds (x, y, width, height) tuples like Room.block_list and
+    vac_pos may be None to let Room pick a random free start tile.
+    Pass a layout to Room(level, layout).
+
+    make_generator("random:500x500:0.2") / ("maze:2000x2000") /
+    ("file:rooms/office.txt") builds a generator from a text spec.
+"""
+
+import numpy as np
+
+from Grid import BLOCK, Grid
+
+
+def mask_to_blocks(mask):
+    """
+    Turns a boolean (height, width) array of blocked tiles into a block
+    list with one (x, y, width, 1) block per horizontal run
+    """
+    blocks = []
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    for y in np.flatnonzero(edges.any(axis=1)).tolist():
+        starts = np.flatnonzero(edges[y] == 1).tolist()
+        ends = np.flatnonzero(edges[y] == -1).tolist()
+        blocks.extend((x, y, end - x, 1) for x, end in zip(starts, ends))
+    return blocks
+
+
+def random_bits(rng, shape):
+    # boolean array of random bits drawn from a random.Random
+    n = int(np.prod(shape))
+    raw = rng.getrandbits(n).to_bytes((n + 7) // 8, "little") if n else b""
+    bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder="little")
+    return bits[:n].astype(bool).reshape(shape)
+
+
+def random_rectangles(width, height, density=0.2, max_block=6):
+    """
+    Random rectangles covering about density of the room. Rectangles keep
+    one free tile between each other (diagonals included) and never span
+    the whole room, so every free tile stays reachable
+    """
+
+    def generator(rng):
+        grid = Grid(width, height)
+        blocks = []
+        target = int(density * width * height)
+        blocked = 0
+        attempts = 0
+        # give up after plenty of rejected placements (density too high)
+        max_attempts = 50 * max(1, target) // max(1, max_block)
+        while blocked < target and attempts < max_attempts:
+            attempts += 1
+            w = rng.randint(1, min(max_block, width - 1))
+            h = rng.randint(1, min(max_block, height - 1))
+            x = rng.randrange(0, width - w + 1)
+            y = rng.randrange(0, height - h + 1)
+            # rect plus a one tile margin must be empty
+            if grid.cells[max(y - 1, 0):y + h + 1, max(x - 1, 0):x + w + 1].any():
+                continue
+            grid.add_rect((x, y, w, h), BLOCK)
+            blocks.append((x, y, w, h))
+            blocked += w * h
+        return (width, height, blocks, None)
+
+    return generator
+
+
+def merge_runs(blocks):
+    # merges (x, y, w, 1) runs stacked in consecutive rows into rectangles
+    open_runs = {}  # (x, w) -> [x, y, w, h] still growing
+    merged = []
+    for x, y, w, h in blocks:
+        run = open_runs.get((x, w))
+        if run is not None and run[1] + run[3] == y:
+            run[3] += h
+        else:
+            if run is not None:
+                merged.append(tuple(run))
+            open_runs[(x, w)] = [x, y, w, h]
+    merged.extend(tuple(run) for run in open_runs.values())
+    merged.sort(key=lambda b: (b[1], b[0]))
+    return merged
+
+
+def maze(width, height):
+    """
+    Binary tree maze: open cells on even (x, y), each cell opens a passage
+    either north or east at random; every free tile is reachable
+    """
+
+    def generator(rng):
+        cols = (width + 1) // 2
+        rows = (height + 1) // 2
+        free = np.zeros((height, width), dtype=bool)
+        free[0::2, 0::2] = True
+        north = random_bits(rng, (rows, cols))
+        north[0, :] = False  # top row can only go east
+        north[:, -1] = True  # right column can only go north
+        # passage north of cell (i, j) is tile (2i, 2j - 1)
+        ys, xs = np.nonzero(north[1:, :])
+        free[2 * ys + 1, 2 * xs] = True
+        # passage east of cell (i, j) is tile (2i + 1, 2j)
+        ys, xs = np.nonzero(~north[:, :-1])
+        free[2 * ys, 2 * xs + 1] = True
+        return (width, height, merge_runs(mask_to_blocks(~free)), (0, 0))
+
+    return generator
+
+
+def from_file(path):
+    """
+    Layout from a text file: '#' is a block tile, 'S' the start tile,
+    anything else (usually '.') a free tile
+    """
+
+    def generator(rng):
+        with open(path) as f:
+            lines = [line.rstrip("\r\n") for line in f if line.strip()]
+        width = max(len(line) for line in lines)
+        height = len(lines)
+        mask = np.zeros((height, width), dtype=bool)
+        start = None
+        for y, line in enumerate(lines):
+            for x, char in enumerate(line):
+                if char == "#":
+                    mask[y, x] = True
+                elif char == "S":
+                    start = (x, y)
+        return (width, height, merge_runs(mask_to_blocks(mask)), start)
+
+    return generator
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def make_generator(spec):
+    """
+    random:WxH[:density[:max_block]]  maze:WxH  file:PATH
+    """
+    kind, _, rest = spec.partition(":")
+    if kind == "file":
+        return from_file(rest)
+    parts = rest.split(":")
+    width, height = parse_size(parts[0])
+    if kind == "random":
+        density = float(parts[1]) if len(parts) > 1 else 0.2
+        max_block = int(parts[2]) if len(parts) > 2 else 6
+        return random_rectangles(width, height, density, max_block)
+    if kind == "maze":
+        return maze(width, height)
+    raise ValueError(f"unknown room generator {kind!r}")
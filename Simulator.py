@@ -0,0 +1,180 @@
+"""
+    Simulator - headless game loop for RoboVac
+    Runs the same move / wall / furniture / coverage rules as
+    PygameRoboVac.main() but without drawing or delays, so controllers
+    can be evaluated at full CPU speed.
+
+    Controllers that define get_next_moves(pos, max_n) hand over a run
+    of up to max_n directions per call, played one tick each; a run
+    stops at its first blocked move and the rest is dropped, so the next
+    call sees from the position where it ended. Single move controllers
+    (get_next_move) are wrapped in SingleMoves and play runs of one.
+"""
+
+from time import perf_counter
+
+from Adjacency import DIRECTIONS
+
+# results of a single move
+MOVED = "MOVED"
+WALL = "WALL"
+FURNITURE = "FURNITURE"
+
+# longest run asked from a get_next_moves controller
+MAX_RUN = 64
+
+
+class SingleMoves:
+    """
+    Adapter giving a single move controller the get_next_moves
+    interface; every run is its one get_next_move direction
+    """
+
+    def __init__(self, robo_vac):
+        self.robo_vac = robo_vac
+
+    def get_next_moves(self, current_pos, max_n=1):
+        return (self.robo_vac.get_next_move(current_pos),)
+
+
+def move_runs(robo_vac):
+    # the controller itself if it plays runs, else its SingleMoves adapter
+    if hasattr(robo_vac, "get_next_moves"):
+        return robo_vac
+    return SingleMoves(robo_vac)
+
+
+class Simulator:
+    def __init__(self, room, robo_vac, max_cycles=400, instruments=None,
+                 max_run=MAX_RUN):
+        """
+        instruments: optional Instrumentation.MoveStats (or anything with
+                     record(seconds, result, mode)) told about every move;
+                     seconds is the call that returned it, None for the
+                     later moves of a run
+        max_run: longest run asked from a get_next_moves controller
+        """
+        self.room = room
+        self.robo_vac = robo_vac
+        self.instruments = instruments
+        self.runs = move_runs(robo_vac)
+        self.max_run = max_run
+
+        # current run of directions and the index of the next to play
+        self.run_moves = ()
+        self.run_index = 0
+
+        # max # game cycles allowed robot
+        self.max_cycles = max_cycles
+
+        # track number of moves; starts at 5 like PygameRoboVac.main()
+        # so Efficiency numbers stay comparable with log.txt
+        self.move_count = 5
+
+        # last direction returned by the RoboVac
+        self.last_dir = -1
+
+        # blocked moves, by what blocked them
+        self.wall_bumps = 0
+        self.furniture_bumps = 0
+
+        # controller calls (one per run)
+        self.calls = 0
+
+        # time spent in get_next_move(s): total and slowest call, in seconds
+        self.move_seconds = 0.0
+        self.max_move_seconds = 0.0
+
+    def is_done(self):
+        return self.is_success() or self.move_count > self.max_cycles
+
+    def is_success(self):
+        return self.room.clean_count == self.room.max_tiles
+
+    def step(self):
+        """
+        Plays the next move of the current run, asking the RoboVac for
+        a new run when it is used up, and applies it to the room.
+        Returns MOVED, WALL or FURNITURE
+        """
+        seconds = None
+        if self.run_index >= len(self.run_moves):
+            # CALL ROBO VAC --Returns Directions based on location
+            # (no more than the cycles left)
+            max_n = max(1, min(self.max_run, self.max_cycles - self.move_count + 1))
+            start = perf_counter()
+            self.run_moves = self.runs.get_next_moves(self.room.vac_pos, max_n)
+            seconds = perf_counter() - start
+            self.run_index = 0
+            self.calls += 1
+            self.move_seconds += seconds
+            if seconds > self.max_move_seconds:
+                self.max_move_seconds = seconds
+        self.move_count += 1
+        dir = self.run_moves[self.run_index]
+        self.run_index += 1
+        self.last_dir = dir
+        result = self.move(dir)
+        if result != MOVED:
+            # a run stops at its first blocked move
+            self.run_index = len(self.run_moves)
+        if self.instruments is not None:
+            # latency is sampled once per call, not per move of a run
+            self.instruments.record(
+                seconds, result, getattr(self.robo_vac, "last_mode", None)
+            )
+        return result
+
+    def move(self, dir):
+        """
+        Determine if direction results in legal move
+        IF YES, update robot position, else pos remains same
+        """
+        room = self.room
+        adjacency = room.adjacency
+        x, y = room.vac_pos  # current position
+        # legal directions of the current tile: one table lookup
+        if dir in (0, 1, 2, 3) and adjacency.legal[y * adjacency.width + x] >> dir & 1:
+            dx, dy = DIRECTIONS[dir]
+            room.vac_pos = (x + dx, y + dy)  # update vacuum position
+            room.add_clean_pos(room.vac_pos)  # track new clean tile
+            return MOVED
+        if dir not in (0, 1, 2, 3) or adjacency.leaves_room((x, y), dir):
+            # tried to go beyond room
+            self.wall_bumps += 1
+            return WALL
+        self.furniture_bumps += 1
+        return FURNITURE
+
+    def run(self):
+        # GAME LOOP ---------
+        while not self.is_done():
+            self.step()
+        return self.results()
+
+    def coverage(self):
+        return self.room.clean_count / self.room.max_tiles
+
+    def efficiency(self):
+        return self.room.max_tiles / self.move_count
+
+    def results(self):
+        """
+        Returns DICT with the numbers reported at the end of a game
+        """
+        return {
+            "success": self.is_success(),
+            "level": self.room.game_level,
+            "coverage": self.coverage(),
+            "cycles": self.move_count,
+            "tiles_cleaned": self.room.clean_count,
+            "max_tiles": self.room.max_tiles,
+            "efficiency": self.efficiency(),
+            "width": self.room.max_width,
+            "height": self.room.max_height,
+            "wall_bumps": self.wall_bumps,
+            "furniture_bumps": self.furniture_bumps,
+            "calls": self.calls,
+            "move_seconds": self.move_seconds,
+            "max_move_seconds": self.max_move_seconds,
+        }
@@ -0,0 +1,316 @@
+"""
+    Tournament - run many seeded RoboVac episodes in parallel
+    Fans episodes for one or more controllers over every level out to a
+    process pool, prints each episode as it finishes and then a summary
+    per controller and level.
+
+    usage: python Tournament.py RoboVac0 RoboVac1 my_vac.py -n 20
+           python Tournament.py RoboVac1 --levels 5 --record traces
+           python Tournament.py RoboVac0 RoboVac1 --store results.db --resume
+           python Tournament.py RoboVac2 --room maze:101x101 --max-cycles 20000
+           python Tournament.py RoboVac1 RoboVac2 RoboVac3 --oracle
+"""
+
+import argparse
+import ast
+import contextlib
+import importlib
+import importlib.util
+import inspect
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Room import Room
+from Instrumentation import MoveStats
+from Oracle import oracle
+from Replay import Recorder
+from ResultsStore import ResultsStore
+from RoomGenerators import make_generator
+from Simulator import Simulator
+
+LEVELS = [0, 1, 2, 3, 4, 5]
+
+# controller classes already imported by this (worker) process
+_controllers = {}
+
+
+def load_controller(spec):
+    """
+    Returns the RoboVac class from a module name (RoboVac1)
+    or from a path to a python file (my_vac.py)
+    """
+    if spec not in _controllers:
+        if spec.endswith(".py"):
+            name = os.path.splitext(os.path.basename(spec))[0]
+            module_spec = importlib.util.spec_from_file_location(name, spec)
+            module = importlib.util.module_from_spec(module_spec)
+            module_spec.loader.exec_module(module)
+        else:
+            module = importlib.import_module(spec)
+        _controllers[spec] = module.RoboVac
+    return _controllers[spec]
+
+
+def episode_rngs(level, seed):
+    """
+    Returns (room_rng, agent_rng): independent random.Random instances
+    derived from the episode seed, so the same (level, seed) gives the
+    same room and the same controller decisions in any process
+    """
+    return (random.Random(f"{level}:{seed}:room"),
+            random.Random(f"{level}:{seed}:agent"))
+
+
+def make_robo_vac(robo_vac_class, config_list, rng, params=None):
+    # controllers that take no rng keyword get just the room config
+    # (and params, keyword arguments such as RoboVac1's thresholds)
+    params = dict(params or {})
+    parameters = inspect.signature(robo_vac_class).parameters
+    if "rng" in parameters or any(
+        p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters.values()
+    ):
+        params["rng"] = rng
+    return robo_vac_class(config_list, **params)
+
+
+def run_episode(controller, level, seed, max_cycles=400, room_spec=None,
+                record=None, stats=False, params=None, bounds=False):
+    """
+    Plays one headless game and returns its results DICT
+    (see Simulator.results) tagged with controller, seed and run time
+    room_spec: RoomGenerators spec to play generated rooms instead of
+               the built-in ones (level is then only a label)
+    record: directory to save a Replay trace of the game in
+    stats: collect Instrumentation.MoveStats, returned as results["stats"]
+    params: DICT of keyword arguments for the controller
+    bounds: add the Oracle bounds for the room and the gap of the
+            controller's moves to the lower bound (successful runs only)
+    """
+    robo_vac_class = load_controller(controller)
+    start = time.perf_counter()
+    room_rng, agent_rng = episode_rngs(level, seed)
+    # controllers without an rng keyword use the global random module
+    random.seed(f"{level}:{seed}")
+    # own controllers log through EventLog; keep any that print quiet
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        layout = make_generator(room_spec)(room_rng) if room_spec else None
+        room = Room(level, layout, room_rng)
+        # the config as the game starts (vac_pos moves with the vacuum)
+        config_list = room.get_room_config()
+        robo_vac = make_robo_vac(robo_vac_class, config_list, agent_rng, params)
+        sim = Simulator(room, robo_vac, max_cycles,
+                        MoveStats() if stats else None)
+        if record:
+            recorder = Recorder(sim, f"{level}:{seed}")
+            results = recorder.run()
+            name = os.path.splitext(os.path.basename(controller))[0]
+            recorder.trace.save(
+                os.path.join(record, f"{name}-L{level}-{seed}.rvt")
+            )
+        else:
+            results = sim.run()
+    results["controller"] = controller
+    results["player_id"] = robo_vac.id
+    results["player_name"] = robo_vac.name
+    results["seed"] = seed
+    results["room"] = room_spec or ""
+    results["max_cycles"] = max_cycles
+    results["seconds"] = time.perf_counter() - start
+    if stats:
+        results["stats"] = sim.instruments
+    if bounds:
+        results.update(oracle(config_list))
+        # moves played: cycles count from 5
+        moves = results["cycles"] - 5
+        results["gap"] = (moves / max(1, results["lower_bound"]) - 1
+                          if results["success"] else None)
+        results["bound_gap"] = (results["upper_bound"]
+                                / max(1, results["lower_bound"]) - 1)
+    return results
+
+
+def run_tournament(controllers, levels=LEVELS, episodes=10, seed=0,
+                   workers=None, max_cycles=400, room_spec=None, record=None,
+                   skip=(), stats=False, bounds=False):
+    """
+    Generator: yields episode results in the order they finish.
+    Every controller plays the same seeds on every level, so episode
+    seed + i is the same room for every controller (see episode_rngs).
+    skip: (controller, level, seed) tuples not to play again
+    """
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_episode, controller, level, seed + i, max_cycles,
+                        room_spec, record, stats, bounds=bounds)
+            for controller in controllers
+            for level in levels
+            for i in range(episodes)
+            if (controller, level, seed + i) not in skip
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summarize(results):
+    """
+    Aggregates episode results per (controller, level)
+    Returns DICT {(controller, level): {stat: value}}
+    """
+    groups = {}
+    for r in results:
+        groups.setdefault((r["controller"], r["level"]), []).append(r)
+
+    summary = {}
+    for key, runs in sorted(groups.items()):
+        n = len(runs)
+        efficiencies = [r["efficiency"] for r in runs]
+        summary[key] = {
+            "episodes": n,
+            "success": sum(r["success"] for r in runs) / n,
+            "coverage": sum(r["coverage"] for r in runs) / n,
+            "cycles": sum(r["cycles"] for r in runs) / n,
+            "efficiency": sum(efficiencies) / n,
+            "min_efficiency": min(efficiencies),
+            "max_efficiency": max(efficiencies),
+        }
+        gaps = [r["gap"] for r in runs if r.get("gap") is not None]
+        if "bound_gap" in runs[0]:
+            # mean gap of successful runs to the Oracle lower bound, and
+            # how far the bounds themselves are apart
+            summary[key]["gap"] = sum(gaps) / len(gaps) if gaps else None
+            summary[key]["bound_gap"] = sum(r["bound_gap"] for r in runs) / n
+    return summary
+
+
+def format_summary(summary):
+    bounds = any("bound_gap" in s for s in summary.values())
+    lines = [
+        f"{'controller':<20} {'level':>5} {'runs':>5} {'success':>8} "
+        f"{'coverage':>8} {'cycles':>7} {'eff':>5} {'min':>5} {'max':>5}"
+        + (f" {'gap':>6} {'bounds':>6}" if bounds else "")
+    ]
+    for (controller, level), s in summary.items():
+        line = (
+            f"{controller:<20} {level:>5} {s['episodes']:>5} "
+            f"{s['success']:>8.2f} {s['coverage']:>8.2f} {s['cycles']:>7.1f} "
+            f"{s['efficiency']:>5.2f} {s['min_efficiency']:>5.2f} "
+            f"{s['max_efficiency']:>5.2f}"
+        )
+        if bounds:
+            gap = s.get("gap")
+            line += (f" {'-' if gap is None else format(gap, '.1%'):>6}"
+                     f" {s['bound_gap']:>6.1%}")
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def parse_levels(text):
+    """ '0-5' or '1,3,5' -> list of levels """
+    levels = []
+    for part in text.split(","):
+        if "-" in part:
+            low, high = part.split("-")
+            levels.extend(range(int(low), int(high) + 1))
+        else:
+            levels.append(int(part))
+    return levels
+
+
+def parse_param(text):
+    """ 'name=value' -> (name, value); value as a python literal if it is one """
+    name, _, value = text.partition("=")
+    if value.lower() in ("true", "false"):
+        return name, value.lower() == "true"
+    try:
+        return name, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return name, value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("controllers", nargs="+",
+                        help="controller module names or .py files")
+    parser.add_argument("-n", "--episodes", type=int, default=10,
+                        help="episodes per controller and level")
+    parser.add_argument("--levels", type=parse_levels, default=None,
+                        help="levels to play, e.g. 0-5 or 3,5 "
+                             "(default 0-5, or 0 with --room)")
+    parser.add_argument("--room", metavar="SPEC",
+                        help="generated rooms, e.g. random:500x500:0.2, "
+                             "maze:101x101 or file:PATH")
+    parser.add_argument("--seed", type=int, default=0, help="first episode seed")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: cpu count)")
+    parser.add_argument("--max-cycles", type=int, default=400)
+    parser.add_argument("--plan-cache", metavar="DIR",
+                        help="directory to keep planner results in between runs")
+    parser.add_argument("--record", metavar="DIR",
+                        help="save a replay trace of every episode in DIR")
+    parser.add_argument("--store", metavar="DB",
+                        help="add every episode to a ResultsStore database")
+    parser.add_argument("--resume", action="store_true",
+                        help="with --store: skip episodes already stored")
+    parser.add_argument("--stats", action="store_true",
+                        help="report move latency, bumps and controller modes")
+    parser.add_argument("--oracle", action="store_true",
+                        help="report the gap of each controller's moves to "
+                             "the Oracle lower bound (bounds: upper / lower)")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="only print the summary")
+    args = parser.parse_args(argv)
+    if args.levels is None:
+        args.levels = [0] if args.room else LEVELS
+    if args.plan_cache:
+        # read by PlanCache.default_cache() in every worker
+        os.environ["ROBOVAC_PLAN_CACHE"] = args.plan_cache
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+
+    store = ResultsStore(args.store) if args.store else None
+    skip = set()
+    if store and args.resume:
+        for controller in args.controllers:
+            skip.update(
+                (controller, level, seed)
+                for level, seed in store.evaluated(controller, args.room or "",
+                                                   args.max_cycles)
+            )
+
+    start = time.perf_counter()
+    results = []
+    for r in run_tournament(args.controllers, args.levels, args.episodes,
+                            args.seed, args.workers, args.max_cycles,
+                            args.room, args.record, skip, args.stats,
+                            args.oracle):
+        results.append(r)
+        if store:
+            store.add(r)
+        if not args.quiet:
+            print(
+                f"{r['controller']} L{r['level']} seed={r['seed']} "
+                f"Coverage:{r['coverage']:.2f} Cycles:{r['cycles']} "
+                f"Eff:{r['efficiency']:.2f}",
+                flush=True,
+            )
+    elapsed = time.perf_counter() - start
+    if store:
+        store.close()
+
+    print(format_summary(summarize(results)))
+    if args.stats:
+        move_stats = {}
+        for r in results:
+            move_stats.setdefault(r["controller"], MoveStats()).merge(r["stats"])
+        for controller, controller_stats in move_stats.items():
+            print(f"\n{controller}\n{controller_stats.report()}")
+    print(f"{len(results)} episodes in {elapsed:.1f}s "
+          f"({len(results) / elapsed:.0f} episodes/s)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+    UnvisitedIndex - spatial index of the tiles a RoboVac still has to visit
+    Answers "Manhattan distance to the closest unvisited tile" without
+    scanning every tile, and is updated in place as tiles get cleaned.
+
+    Each grid row is stored as an int bitset (bit x set = tile (x, y)
+    unvisited) and a second bitset marks the non-empty rows. A query walks
+    the non-empty rows outwards from the query row and stops as soon as
+    the row distance alone can no longer beat the best match, so each row
+    costs a couple of big-int operations instead of W tuple visits.
+    Storage is one bit per tile, so the index doubles as the set of
+    unvisited tiles itself.
+"""
+
+
+def _low_bit(v):
+    # index of the lowest set bit of v (v > 0)
+    return (v & -v).bit_length() - 1
+
+
+class UnvisitedIndex:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.rows = [0] * height
+        self.row_mask = 0  # bit y set when row y has an unvisited tile
+        self.count = 0
+
+    def set_rows(self, rows):
+        """
+        Replaces the contents with one int bitset per row
+        (see Grid.row_bits)
+        """
+        full = (1 << self.width) - 1
+        self.rows = [row & full for row in rows]
+        self.row_mask = 0
+        self.count = 0
+        for y, row in enumerate(self.rows):
+            if row:
+                self.row_mask |= 1 << y
+                self.count += bin(row).count("1")
+
+    def add(self, pos):
+        x, y = pos
+        bit = 1 << x
+        if not self.rows[y] & bit:
+            self.rows[y] |= bit
+            self.row_mask |= 1 << y
+            self.count += 1
+
+    def discard(self, pos):
+        x, y = pos
+        if 0 <= y < self.height and x >= 0 and self.rows[y] >> x & 1:
+            self.rows[y] ^= 1 << x
+            if not self.rows[y]:
+                self.row_mask ^= 1 << y
+            self.count -= 1
+
+    def __contains__(self, pos):
+        x, y = pos
+        return 0 <= y < self.height and x >= 0 and bool(self.rows[y] >> x & 1)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        # unvisited tiles, row by row
+        for y, row in enumerate(self.rows):
+            while row:
+                low = row & -row
+                yield (low.bit_length() - 1, y)
+                row ^= low
+
+    def choice(self, rng):
+        # uniformly random unvisited tile, picked with rng (random.Random)
+        k = rng.randrange(self.count)
+        for y, row in enumerate(self.rows):
+            n = bin(row).count("1")
+            if k < n:
+                for _ in range(k):
+                    row &= row - 1  # drop lowest set bit
+                return (_low_bit(row), y)
+            k -= n
+
+    def _next_row(self, y):
+        # first non-empty row >= y, or None
+        v = self.row_mask >> max(y, 0)
+        return max(y, 0) + _low_bit(v) if v else None
+
+    def _prev_row(self, y):
+        # last non-empty row <= y, or None
+        if y < 0:
+            return None
+        v = self.row_mask & ((1 << (y + 1)) - 1)
+        return v.bit_length() - 1 if v else None
+
+    def _row_nearest(self, row, x):
+        # x of the unvisited tile in row closest to column x
+        best = None
+        right = row >> max(x, 0)
+        if right:
+            best = max(x, 0) + _low_bit(right)
+        if x >= 0:
+            left = row & ((1 << (x + 1)) - 1)
+            if left:
+                left_x = left.bit_length() - 1
+                if best is None or x - left_x < best - x:
+                    best = left_x
+        return best
+
+    def nearest(self, pos):
+        """
+        Returns (distance, tile) of the closest unvisited tile;
+        (inf, None) when every tile has been visited
+        """
+        x, y = pos
+        best = float("inf")
+        best_tile = None
+        below = self._next_row(y)
+        above = self._prev_row(y - 1)
+        while below is not None or above is not None:
+            # visit rows in order of increasing row distance
+            if above is None or (below is not None and below - y <= y - above):
+                row_y = below
+                below = self._next_row(below + 1)
+            else:
+                row_y = above
+                above = self._prev_row(above - 1)
+            dy = abs(row_y - y)
+            if dy >= best:
+                break
+            row_x = self._row_nearest(self.rows[row_y], x)
+            distance = dy + abs(row_x - x)
+            if distance < best:
+                best = distance
+                best_tile = (row_x, row_y)
+        return best, best_tile
+
+    def distance(self, pos):
+        # Manhattan distance to the closest unvisited tile (inf if none)
+        return self.nearest(pos)[0]
@@ -0,0 +1,298 @@
+"""
+    bench - compute cost benchmarks for RoboVac controllers and the simulator
+    Times Room construction, controller construction, get_next_move per call
+    and full-episode throughput across room sizes and block densities with
+    fixed seeds. Writes machine readable JSON; compare two runs with
+    compare.py.
+
+    Times are taken untraced; peak memory comes from a separate pass under
+    tracemalloc, which slows python code down many times over. Every
+    get_next_move case runs in a worker process, so each of its stages
+    (room, controller construction, move timing, traced pass) can be held
+    to the --budget: a case whose construction runs over is reported as
+    skipped, one whose traced pass runs over without init_peak_bytes.
+
+    usage: python benchmarks/bench.py -o bench.json
+           python benchmarks/bench.py --sizes 14,100 --controllers RoboVac2
+"""
+
+import argparse
+import contextlib
+import datetime
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PlanCache import default_cache  # noqa: E402
+from Room import Room  # noqa: E402
+from RoomGenerators import random_rectangles  # noqa: E402
+from Simulator import Simulator  # noqa: E402
+from Tournament import make_robo_vac  # noqa: E402
+
+SIZES = [14, 100, 500, 2000]
+DENSITIES = [0.0, 0.1, 0.3]
+CONTROLLERS = ["RoboVac0", "RoboVac1", "RoboVac2", "RoboVac3"]
+
+
+@contextlib.contextmanager
+def quiet():
+    # controllers that still print; keep their output out of the timings
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def make_layout(size, density, seed):
+    rng = random.Random(f"bench:{size}:{density}:{seed}")
+    return random_rectangles(size, size, density)(rng)
+
+
+def make_room(layout, seed):
+    return Room(0, layout, random.Random(f"bench-room:{seed}"))
+
+
+def make_agent(robo_vac_class, room, seed):
+    return make_robo_vac(robo_vac_class, room.get_room_config(),
+                         random.Random(f"bench-agent:{seed}"))
+
+
+def cold_cache():
+    # constructions start from scratch: no plans of earlier passes or
+    # from a ROBOVAC_PLAN_CACHE disk store
+    cache = default_cache()
+    cache.path = None
+    cache.clear()
+
+
+def percentiles(samples, points=(50, 90, 99)):
+    # nearest-rank percentiles of a list of numbers, plus max
+    ordered = sorted(samples)
+    stats = {}
+    for p in points:
+        index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+        stats[f"p{p}"] = ordered[index]
+    stats["max"] = ordered[-1]
+    return stats
+
+
+def timed(function):
+    """
+    Runs function untraced; returns (result, seconds)
+    """
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def peak_bytes(function):
+    """
+    Runs function under tracemalloc; returns its peak traced bytes
+    (a pass of its own: tracing would swamp any time taken here)
+    """
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_room(size, density, seed, repeat):
+    layout = make_layout(size, density, seed)
+    times = [timed(lambda: make_room(layout, seed + i))[1] for i in range(repeat)]
+    peak = peak_bytes(lambda: make_room(layout, seed))
+    return {
+        "bench": "room_init",
+        "size": size,
+        "density": density,
+        "blocks": len(layout[2]),
+        "repeat": repeat,
+        "seconds": percentiles(times),
+        "peak_bytes": peak,
+    }
+
+
+def moves_worker(stages, controller, size, density, seed, moves, budget):
+    """
+    Worker process of bench_moves; puts (stage, DICT of results) on the
+    stages queue as each stage is done
+    """
+    robo_vac_class = importlib.import_module(controller).RoboVac
+    room = make_room(make_layout(size, density, seed), seed)
+    stages.put(("room", {}))
+    with quiet():
+        cold_cache()
+        robo_vac, init_seconds = timed(lambda: make_agent(robo_vac_class, room, seed))
+        stages.put(("construction", {"init_seconds": init_seconds}))
+        sim = Simulator(room, robo_vac, max_cycles=moves)
+        latencies = []
+        clock = time.perf_counter
+        deadline = clock() + budget
+        while not sim.is_done() and clock() < deadline:
+            start = clock()
+            dir = robo_vac.get_next_move(room.vac_pos)
+            latencies.append(clock() - start)
+            sim.move_count += 1
+            sim.move(dir)
+        stages.put(("moves", {
+            "calls": len(latencies),
+            "latency_us": {
+                k: v * 1e6 for k, v in percentiles(latencies or [0.0]).items()
+            },
+            "mean_us": sum(latencies) / max(1, len(latencies)) * 1e6,
+        }))
+        room = make_room(make_layout(size, density, seed), seed)
+        cold_cache()
+        init_peak = peak_bytes(lambda: make_agent(robo_vac_class, room, seed))
+        stages.put(("peak", {"init_peak_bytes": init_peak}))
+
+
+def bench_moves(controller, size, density, seed, moves, budget):
+    """
+    Constructs the controller, then times get_next_move call by call for up
+    to moves calls or budget seconds, then measures construction memory in
+    a traced pass. Runs in a worker process that is stopped when a stage
+    takes more than budget seconds (the move loop stops itself at budget;
+    its stage gets twice that, for the last call)
+    """
+    result = {
+        "bench": "get_next_move",
+        "controller": controller,
+        "size": size,
+        "density": density,
+    }
+    stages = multiprocessing.Queue()
+    worker = multiprocessing.Process(
+        target=moves_worker,
+        args=(stages, controller, size, density, seed, moves, budget),
+        daemon=True,
+    )
+    worker.start()
+    try:
+        for stage, timeout in (("room", budget), ("construction", budget),
+                               ("moves", 2 * budget), ("peak", budget)):
+            try:
+                name, values = stages.get(timeout=timeout)
+            except queue.Empty:
+                if stage != "peak":
+                    result["skipped"] = f"{stage} over the {budget:g}s budget"
+                break
+            result.update(values)
+    finally:
+        worker.terminate()
+        worker.join()
+    return result
+
+
+def bench_episodes(controller, size, density, seed, episodes, budget):
+    """
+    Full headless episodes (max cycles = 3 x tiles) back to back
+    """
+    robo_vac_class = importlib.import_module(controller).RoboVac
+    layout = make_layout(size, density, seed)
+    max_cycles = 3 * size * size
+    played = 0
+    moves = 0
+    coverage = 0.0
+    start = time.perf_counter()
+    with quiet():
+        while played < episodes and time.perf_counter() - start < budget:
+            room = make_room(layout, seed + played)
+            results = Simulator(
+                room, make_agent(robo_vac_class, room, seed + played), max_cycles
+            ).run()
+            played += 1
+            moves += results["cycles"] - 5
+            coverage += results["coverage"]
+    seconds = time.perf_counter() - start
+    return {
+        "bench": "episodes",
+        "controller": controller,
+        "size": size,
+        "density": density,
+        "episodes": played,
+        "seconds": seconds,
+        "episodes_per_second": played / seconds,
+        "moves_per_second": moves / seconds,
+        "mean_coverage": coverage / max(1, played),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_list(kind):
+    return lambda text: [kind(part) for part in text.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("--sizes", type=parse_list(int), default=SIZES)
+    parser.add_argument("--densities", type=parse_list(float), default=DENSITIES)
+    parser.add_argument("--controllers", type=parse_list(str), default=CONTROLLERS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--moves", type=int, default=500,
+                        help="get_next_move calls timed per case")
+    parser.add_argument("--episodes", type=int, default=20,
+                        help="episodes per throughput case")
+    parser.add_argument("--episode-sizes", type=parse_list(int), default=[14, 100],
+                        help="sizes to run full episodes on")
+    parser.add_argument("--room-repeat", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=20.0,
+                        help="seconds per case before it stops sampling")
+    parser.add_argument("-o", "--output", help="JSON file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    results = []
+
+    def record(result):
+        results.append(result)
+        print(json.dumps(result), file=sys.stderr, flush=True)
+
+    for size in args.sizes:
+        for density in args.densities:
+            record(bench_room(size, density, args.seed, args.room_repeat))
+            for controller in args.controllers:
+                record(bench_moves(controller, size, density, args.seed,
+                                   args.moves, args.budget))
+                if size in args.episode_sizes:
+                    record(bench_episodes(controller, size, density, args.seed,
+                                          args.episodes, args.budget))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
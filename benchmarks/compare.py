@@ -0,0 +1,64 @@
+"""
+    compare - diff two bench.py JSON reports
+    Prints the main number of every case found in both reports with the
+    relative change; changes beyond the threshold are flagged. Cases that
+    ran over their budget in either report are listed as skipped.
+
+    usage: python benchmarks/compare.py old.json new.json [--threshold 0.1]
+"""
+
+import argparse
+import json
+
+# main number per benchmark and whether higher is better
+METRICS = {
+    "room_init": (lambda r: r["seconds"]["p50"], False),
+    "get_next_move": (lambda r: r["latency_us"]["p50"], False),
+    "episodes": (lambda r: r["episodes_per_second"], True),
+}
+
+
+def case_key(result):
+    return (result["bench"], result.get("controller", ""), result["size"],
+            result["density"])
+
+
+def load(path):
+    with open(path) as f:
+        return {case_key(r): r for r in json.load(f)["results"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative change to flag (default 0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    old, new = load(args.old), load(args.new)
+    regressions = 0
+    for key in sorted(old.keys() & new.keys()):
+        bench, controller, size, density = key
+        if "skipped" in old[key] or "skipped" in new[key]:
+            reason = new[key].get("skipped") or old[key].get("skipped")
+            print(f"{bench:<14} {controller:<10} {size:>5} {density:>4} "
+                  f"skipped: {reason}")
+            continue
+        metric, higher_is_better = METRICS[key[0]]
+        before, after = metric(old[key]), metric(new[key])
+        change = (after - before) / before if before else 0.0
+        worse = -change if higher_is_better else change
+        flag = ""
+        if worse > args.threshold:
+            flag = "REGRESSION"
+            regressions += 1
+        elif worse < -args.threshold:
+            flag = "faster"
+        print(f"{bench:<14} {controller:<10} {size:>5} {density:>4} "
+              f"{before:>12.4g} {after:>12.4g} {change:>+7.1%} {flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
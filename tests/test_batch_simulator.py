@@ -0,0 +1,67 @@
+"""
+    BatchSimulator plays by the same rules as Simulator: the same
+    controllers on the same rooms give the same results
+"""
+
+import random
+
+import pytest
+
+import RoboVac0
+import RoboVac2
+from BatchSimulator import BatchSimulator, agent_policy
+from Room import Room
+from RoomGenerators import make_generator
+from Simulator import Simulator
+
+# results both simulators report
+FIELDS = ("success", "level", "coverage", "cycles", "tiles_cleaned", "max_tiles",
+          "efficiency", "width", "height", "wall_bumps", "furniture_bumps")
+
+
+class Erratic:
+    # random directions, some of them not directions at all
+    def __init__(self, config_list, rng=None):
+        self.rng = rng
+
+    def get_next_move(self, current_pos):
+        return self.rng.choice((-1, 0, 1, 2, 3, 4))
+
+
+# (level, room spec, seed): built-in levels and a generated room, 40 rooms
+GAMES = [(level % 6, None if level < 6 else "random:15x12:0.2", seed)
+         for level in range(8) for seed in range(5)]
+
+
+def build_room(level, spec, seed):
+    rng = random.Random(f"{level}:{seed}")
+    return Room(level, make_generator(spec)(rng) if spec else None, rng)
+
+
+@pytest.mark.parametrize("controller", [RoboVac0.RoboVac, RoboVac2.RoboVac, Erratic])
+def test_matches_simulator(controller):
+    expected = []
+    for game in GAMES:
+        room = build_room(*game)
+        robo_vac = controller(room.get_room_config(), rng=random.Random(str(game)))
+        expected.append(Simulator(room, robo_vac).run())
+
+    rooms = [build_room(*game) for game in GAMES]
+    agents = [controller(room.get_room_config(), rng=random.Random(str(game)))
+              for game, room in zip(GAMES, rooms)]
+    results = BatchSimulator(rooms).run(agent_policy(agents))
+    for got, want in zip(results, expected):
+        assert {field: got[field] for field in FIELDS} == {
+            field: want[field] for field in FIELDS
+        }
+
+
+def test_invalid_directions_bump_walls():
+    rng = random.Random(0)
+    rooms = [Room(level, None, rng) for level in (0, 5)]
+    sim = BatchSimulator(rooms)
+    start = sim.positions().copy()
+    sim.step([-1, 4])
+    assert (sim.positions() == start).all()
+    assert sim.wall_bumps.tolist() == [1, 1]
+    assert sim.clean_count.tolist() == [1, 1]
@@ -0,0 +1,135 @@
+"""
+    MultiVac: partition() splits the reachable tiles into connected,
+    disjoint regions of about equal size, MultiSimulator keeps every
+    vacuum in its own region, and RoboVac2 picks its route up again
+    after a blocked run
+"""
+
+import random
+
+import pytest
+
+import RoboVac2
+from MultiVac import MultiSimulator, partition, region_config, spread_starts
+from Room import Room
+from RoomGenerators import make_generator
+from Simulator import FURNITURE
+
+ROOMS = [(spec, seed) for spec in ("random:20x20:0.0", "random:30x17:0.0",
+                                   "random:30x30:0.2", "random:25x25:0.3")
+         for seed in range(3)]
+
+
+def make_room(spec, seed):
+    rng = random.Random(seed)
+    return Room(0, make_generator(spec)(rng), rng)
+
+
+def region_tiles(adjacency, labels, start):
+    # BFS from start over the tiles of its region
+    region = labels[adjacency.index(start)]
+    seen = {adjacency.index(start)}
+    frontier = [start]
+    while frontier:
+        pos = frontier.pop()
+        for next_pos, _, j in adjacency.moves(pos):
+            if labels[j] == region and j not in seen:
+                seen.add(j)
+                frontier.append(next_pos)
+    return seen
+
+
+class Wanderer:
+    # random directions, so it keeps trying to leave its region
+    def __init__(self, config_list, rng=None):
+        self.rng = rng
+
+    def get_next_move(self, current_pos):
+        return self.rng.randrange(4)
+
+
+@pytest.mark.parametrize("spec, seed", ROOMS + [("maze:15x15", 0), ("maze:21x11", 1)])
+@pytest.mark.parametrize("k", [1, 2, 3, 5, 8])
+def test_partition(spec, seed, k):
+    room = make_room(spec, seed)
+    adjacency = room.adjacency
+    starts = spread_starts(adjacency, room.vac_pos, k)
+    labels, sizes = partition(adjacency, starts)
+    assert len(sizes) == len(starts)
+    reachable = {i for i, d in enumerate(adjacency.distances(room.vac_pos)) if d >= 0}
+    assert {i for i, region in enumerate(labels) if region >= 0} == reachable
+    for region, start in enumerate(starts):
+        # every region is connected: all its tiles are reached from its start
+        tiles = region_tiles(adjacency, labels, start)
+        assert labels[adjacency.index(start)] == region
+        assert tiles == {i for i, label in enumerate(labels) if label == region}
+        assert len(tiles) == sizes[region]
+    # one label per tile: regions are disjoint and add up to the reachable tiles
+    assert sum(sizes) == len(reachable)
+    if not spec.startswith("maze"):
+        # (a maze is a tree: regions meet in corridors and cannot even out)
+        assert max(sizes) - min(sizes) < len(starts)
+
+
+@pytest.mark.parametrize("spec, seed", ROOMS[::2])
+@pytest.mark.parametrize("controller", [RoboVac2.RoboVac, Wanderer])
+def test_vacuums_stay_in_their_regions(spec, seed, controller):
+    room = make_room(spec, seed)
+    starts = spread_starts(room.adjacency, room.vac_pos, 4)
+    labels, _ = partition(room.adjacency, starts)
+    robo_vacs = [controller(region_config(room, labels, region, start),
+                            random.Random(f"{seed}:agent{region}"))
+                 for region, start in enumerate(starts)]
+    sim = MultiSimulator(room, robo_vacs, starts, labels, max_cycles=3000, workers=0)
+    while not sim.is_done():
+        sim.step()
+        for i, pos in enumerate(sim.positions):
+            assert labels[room.adjacency.index(pos)] == i
+    if controller is Wanderer:
+        assert sim.bumps[FURNITURE] > 0
+    else:
+        # the route keeps to the region
+        assert sim.is_success() and sim.bumps[FURNITURE] == 0
+    sim.close()
+
+
+def walk(pos, moves):
+    for direction in moves:
+        pos = (pos[0] + RoboVac2.DIRECTIONS[direction][0],
+               pos[1] + RoboVac2.DIRECTIONS[direction][1])
+    return pos
+
+
+@pytest.mark.parametrize("played", [0, 1, 5])
+def test_resync_rewinds_after_a_blocked_run(played):
+    room = make_room("random:20x20:0.2", 4)
+    robo_vac = RoboVac2.RoboVac(room.get_room_config())
+    route = list(robo_vac.route)
+    pos = walk(room.vac_pos, robo_vac.get_next_moves(room.vac_pos, 7))
+    robo_vac.get_next_moves(pos, 10)
+    run_index = robo_vac.run_index
+    assert run_index == 7
+    # the run was blocked after played moves: the rest is played again
+    pos = walk(room.vac_pos, route[:run_index + played])
+    run = robo_vac.get_next_moves(pos, 10)
+    assert robo_vac.run_index == run_index + played
+    assert list(run) == route[run_index + played:run_index + played + 10]
+    assert list(robo_vac.route) == route
+
+
+def test_resync_replans_off_the_route():
+    room = make_room("random:20x20:0.2", 4)
+    robo_vac = RoboVac2.RoboVac(room.get_room_config())
+    run = robo_vac.get_next_moves(room.vac_pos, 10)
+    on_run = {walk(room.vac_pos, run[:n]) for n in range(len(run) + 1)}
+    # a free tile the run does not pass, e.g. pushed there by another vacuum
+    pos = next(room.adjacency.position(i)
+               for i, d in enumerate(room.adjacency.distances(room.vac_pos))
+               if d > 0 and room.adjacency.position(i) not in on_run)
+    run = robo_vac.get_next_moves(pos, 10)
+    assert robo_vac.run_pos == pos and robo_vac.run_index == 0
+    # the new route starts where the vacuum is and goes around the blocks
+    position = pos
+    for direction in run:
+        assert room.adjacency.is_legal(position, direction)
+        position = walk(position, [direction])
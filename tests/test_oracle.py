@@ -0,0 +1,69 @@
+"""
+    Oracle bounds against brute force: on tiny rooms the exact search
+    must find the fewest moves a breadth first search over every
+    (tile, visited set) state finds, with the bounds on either side
+"""
+
+import random
+from collections import deque
+
+import pytest
+
+from CoveragePlanner import plan_coverage
+from Oracle import CoverageSearch, lower_bound, solve
+from Room import Room
+from RoomGenerators import make_generator
+
+TINY = ["random:4x4:0.2", "random:5x4:0.25", "random:5x5:0.2", "maze:5x5",
+        "random:6x3:0.2", "maze:7x3"]
+
+
+def make_room(spec, seed):
+    rng = random.Random(f"0:{seed}:room")
+    return Room(0, make_generator(spec)(rng), rng)
+
+
+def fewest_moves(search):
+    # BFS over (tile, visited bits) states
+    start = (0, 1)
+    seen = {start}
+    frontier = deque([(start, 0)])
+    while frontier:
+        (pos, visited), moves = frontier.popleft()
+        if visited == search.full:
+            return moves
+        for k in search.neighbours[pos]:
+            state = (k, visited | 1 << k)
+            if state not in seen:
+                seen.add(state)
+                frontier.append((state, moves + 1))
+
+
+@pytest.mark.parametrize("spec", TINY)
+@pytest.mark.parametrize("seed", range(10))
+def test_exact_matches_brute_force(spec, seed):
+    room = make_room(spec, seed)
+    search = CoverageSearch(room.adjacency, room.vac_pos)
+    best = fewest_moves(search)
+    result = solve(room.get_room_config())
+    assert result["tiles"] == search.size
+    assert result["optimal"] == best
+    assert search.lower_bound() <= best
+    assert lower_bound(room.adjacency, room.vac_pos) <= best
+
+
+@pytest.mark.parametrize("spec", ["random:20x15:0.25", "random:30x30:0.4", "maze:21x11"])
+@pytest.mark.parametrize("seed", range(5))
+def test_bounds(spec, seed):
+    room = make_room(spec, seed)
+    config_list = room.get_room_config()
+    # the flat bound is the bitmask bound at the start
+    lower = lower_bound(room.adjacency, room.vac_pos)
+    assert lower == CoverageSearch(room.adjacency, room.vac_pos).lower_bound()
+    # without the exact search: bound and planner route, which is
+    # what RoboVac2 plays
+    result = solve(config_list, exact_tiles=0)
+    route = plan_coverage(*config_list[0], config_list[2], tuple(config_list[1]))
+    assert result["lower_bound"] == lower
+    assert result["upper_bound"] == len(route)
+    assert lower <= len(route)
@@ -0,0 +1,55 @@
+"""
+    Replay round trips: a recorded trace survives to_bytes / from_bytes
+    and plays back the positions and coverage of the game it came from
+"""
+
+import pytest
+
+import RoboVac1
+from Replay import Recorder, Replay, Trace
+from Room import Room
+from RoomGenerators import make_generator
+from Simulator import Simulator
+from Tournament import episode_rngs
+
+
+def record(level, spec, seed):
+    # plays one RoboVac1 game; returns (recorder, room, position per tick)
+    room_rng, agent_rng = episode_rngs(level, seed)
+    layout = make_generator(spec)(room_rng) if spec else None
+    room = Room(level, layout, room_rng)
+    sim = Simulator(room, RoboVac1.RoboVac(room.get_room_config(), rng=agent_rng))
+    recorder = Recorder(sim, seed)
+    positions = [room.vac_pos]
+    while not sim.is_done():
+        recorder.step()
+        positions.append(room.vac_pos)
+    return recorder, room, positions
+
+
+@pytest.mark.parametrize("level, spec", [(0, None), (5, None),
+                                         (0, "random:30x20:0.2"), (0, "maze:21x21")])
+@pytest.mark.parametrize("seed", range(3))
+def test_round_trip(level, spec, seed):
+    recorder, room, positions = record(level, spec, seed)
+    data = recorder.trace.to_bytes()
+    trace = Trace.from_bytes(data)
+    assert trace.to_bytes() == data
+    assert trace.dirs == recorder.trace.dirs
+    assert trace.blocked == recorder.trace.blocked
+
+    replay = Replay(trace, keyframe_interval=16)
+    assert len(replay) == len(positions) - 1
+    assert [replay.vac_pos(tick) for tick in range(len(replay) + 1)] == positions
+    end = replay.room(len(replay))
+    assert end.clean_count == room.clean_count
+    assert (end.grid.cells == room.grid.cells).all()
+
+
+def test_seek_matches_counts():
+    recorder, _, positions = record(5, None, 0)
+    replay = Replay(Trace.from_bytes(recorder.trace.to_bytes()), keyframe_interval=16)
+    for tick in (0, 1, 15, 16, 17, 37, len(replay)):
+        vac_pos, clean = replay.seek(tick)
+        assert vac_pos == positions[tick]
+        assert sum(clean) == replay.clean_count(tick)
@@ -0,0 +1,97 @@
+"""
+    ResultsStore: append-only episodes, log.txt imports that neither
+    lose nor repeat lines, and --resume skipping stored episodes
+"""
+
+import sqlite3
+
+import Tournament
+from ResultsStore import ResultsStore
+
+LINES_A = [
+    "2023-09-24 18:14 66666666 Zarkon Zeeblebrock  L0 Coverage:1.00 Eff:0.98\n",
+    "2023-09-24 18:15 66666666 Zarkon Zeeblebrock  L5 Coverage:0.91 Eff:0.70\n",
+]
+LINES_B = [
+    "2023-10-02 09:01 47514289 Sanjee Yogeswaran  L3 Coverage:1.00 Eff:0.81\n",
+    "2023-10-02 09:02 47514289 Sanjee Yogeswaran  L4 Coverage:0.97 Eff:0.77\n",
+]
+
+
+def write_log(directory, lines):
+    directory.mkdir(exist_ok=True)
+    path = directory / "log.txt"
+    path.write_text("".join(lines))
+    return str(path)
+
+
+def count(store, where="1"):
+    return store.db.execute(f"SELECT COUNT(*) FROM episodes WHERE {where}").fetchone()[0]
+
+
+def test_logs_with_the_same_name(tmp_path):
+    with ResultsStore(str(tmp_path / "results.db")) as store:
+        assert store.import_log(write_log(tmp_path / "a", LINES_A)) == 2
+        assert store.import_log(write_log(tmp_path / "b", LINES_B)) == 2
+        # imported again, or a copy of it: nothing new
+        assert store.import_log(str(tmp_path / "a" / "log.txt")) == 0
+        assert store.import_log(write_log(tmp_path / "copy", LINES_A)) == 0
+        # the log grew since: only the new line
+        assert store.import_log(write_log(tmp_path / "a", LINES_A + LINES_B[:1])) == 1
+        summary = store.summary()
+    assert {level for _, level in summary} == {0, 3, 4, 5}
+    assert sum(stats["episodes"] for stats in summary.values()) == 5
+
+
+def test_reruns_are_appended(tmp_path):
+    result = {"controller": "RoboVac2", "level": 5, "seed": 3, "max_cycles": 400,
+              "cycles": 180, "efficiency": 0.8}
+    with ResultsStore(str(tmp_path / "results.db"), batch_size=1) as store:
+        store.add(result)
+        store.add(dict(result, cycles=190))
+        store.add(dict(result, seed=4))
+        assert count(store) == 3
+        assert count(store, "seed = 3") == 2
+        assert store.evaluated("RoboVac2") == {(5, 3), (5, 4)}
+        assert store.evaluated("RoboVac2", max_cycles=1000) == set()
+        assert store.evaluated("RoboVac2", room="random:10x10:0.2") == set()
+        assert store.evaluated("RoboVac1") == set()
+
+
+def test_resume_skips_stored_episodes(tmp_path):
+    db = str(tmp_path / "results.db")
+    args = ["RoboVac2", "--levels", "0,5", "--episodes", "3", "--workers", "1",
+            "--store", db, "-q"]
+    Tournament.main(args)
+    Tournament.main(args + ["--resume"])
+    with ResultsStore(db) as store:
+        assert count(store) == 6
+        assert store.evaluated("RoboVac2") == {(level, seed) for level in (0, 5)
+                                               for seed in range(3)}
+    # without --resume the same episodes are stored again
+    Tournament.main(args)
+    with ResultsStore(db) as store:
+        assert count(store) == 12
+
+
+def test_older_database(tmp_path):
+    # a database from before the store was append-only keeps its rows
+    # and loses its unique keys
+    db = str(tmp_path / "results.db")
+    with ResultsStore(db) as store:
+        store.import_log(write_log(tmp_path / "a", LINES_A))
+        store.db.executescript(
+            "DROP INDEX episode_lookup; DROP INDEX episode_log_entry;"
+            "CREATE UNIQUE INDEX episode_key"
+            " ON episodes (controller, level, seed, room, max_cycles);"
+            "CREATE UNIQUE INDEX episode_log_line ON episodes (log_line);"
+        )
+    with ResultsStore(db, batch_size=1) as store:
+        assert store.import_log(write_log(tmp_path / "b", LINES_B)) == 2
+        assert store.import_log(str(tmp_path / "a" / "log.txt")) == 0
+        result = {"controller": "RoboVac2", "level": 5, "seed": 3, "max_cycles": 400}
+        store.add(result)
+        store.add(result)
+        assert count(store) == 6
+    indexes = {row[1] for row in sqlite3.connect(db).execute("PRAGMA index_list(episodes)")}
+    assert indexes == {"episode_lookup", "episode_log_entry"}
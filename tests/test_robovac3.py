@@ -0,0 +1,69 @@
+"""
+    RoboVac3's incremental D* Lite plan against a fresh search: after
+    every call the vacuum's tile knows its BFS distance to the closest
+    unvisited tile on the map known so far (as min(g, rhs): the search
+    stops once rhs <= g there), and every run steps down that distance
+"""
+
+import random
+from collections import deque
+
+import pytest
+
+import RoboVac3
+from Room import Room
+from RoomGenerators import make_generator
+from Simulator import Simulator
+
+INF = float("inf")
+
+
+def goal_distances(robo_vac):
+    # BFS from every unvisited tile at once over the known map
+    adjacency = robo_vac.adjacency
+    distances = [INF] * (adjacency.width * adjacency.height)
+    frontier = deque()
+    for i, goal in enumerate(robo_vac.goal):
+        if goal:
+            distances[i] = 0
+            frontier.append(i)
+    while frontier:
+        i = frontier.popleft()
+        for j in robo_vac.neighbours(i):
+            if distances[j] == INF:
+                distances[j] = distances[i] + 1
+                frontier.append(j)
+    return distances
+
+
+class CheckedRoboVac(RoboVac3.RoboVac):
+    def get_next_moves(self, current_pos, max_n):
+        run = super().get_next_moves(current_pos, max_n)
+        if self.last_mode != RoboVac3.DONE:
+            distances = goal_distances(self)
+            tiles = [self.adjacency.index(pos) for pos in self.run_tiles]
+            # exact at the vacuum (tiles further out may still be
+            # queued), and the run goes downhill
+            start = tiles[0]
+            assert min(self.g[start], self.rhs[start]) == distances[start]
+            assert all(distances[b] == distances[a] - 1
+                       for a, b in zip(tiles, tiles[1:]))
+            # a run ends on an unvisited tile unless it hit max_n
+            assert distances[tiles[-1]] == 0 or len(run) == max_n
+        return run
+
+
+@pytest.mark.parametrize("spec, seed", [("random:20x20:0.25", 1), ("maze:15x15", 2),
+                                        ("random:25x15:0.1", 3)])
+@pytest.mark.parametrize("known_blocks", [False, True])
+@pytest.mark.parametrize("max_run", [1, 64])
+def test_plan_matches_bfs(spec, seed, known_blocks, max_run):
+    rng = random.Random(seed)
+    room = Room(0, make_generator(spec)(rng), rng)
+    start = room.vac_pos
+    robo_vac = CheckedRoboVac(room.get_room_config(), known_blocks=known_blocks)
+    sim = Simulator(room, robo_vac, max_cycles=100000, max_run=max_run)
+    sim.run()
+    # every tile reachable from the start gets cleaned
+    reachable = sum(1 for d in room.adjacency.distances(start) if d >= 0)
+    assert room.clean_count == reachable
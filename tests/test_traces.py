@@ -0,0 +1,60 @@
+"""
+    Golden game traces: every controller plays the same seeded games and
+    the hash of its directions must not change. Speed-ups are meant to
+    leave moves alone; when a change is meant to alter them, print the
+    new hashes with python -m tests.test_traces and update TRACES.
+"""
+
+import hashlib
+
+import pytest
+
+from Room import Room
+from RoomGenerators import make_generator
+from Simulator import Simulator
+from Tournament import episode_rngs, load_controller, make_robo_vac
+
+# (controller, params) -> sha1 of its directions over GAMES x SEEDS
+TRACES = {
+    ("RoboVac0", ()): "dc977e46d33f0f447ce39c2534413f7c7bbac9bd",
+    ("RoboVac1", ()): "ce27ab73b417e718b872026ac525751c6f19d6b3",
+    ("RoboVac1", (("geodesic_seek", False),)): "7b7998e91f226843fb251d05258764668fb96d1f",
+    ("RoboVac2", ()): "3c2d7b91a462d27f30c209252543fbc1adec29d4",
+    ("RoboVac3", ()): "e9094f908e2909cd7f8825001aaf7b74240f888b",
+    ("RoboVac3", (("known_blocks", True),)): "2839287e80e360b1f80549653730b358add25ede",
+}
+
+# (level, room spec) of the games played, each with every seed
+GAMES = [(level, None) for level in range(6)] + [(0, "random:25x25:0.2")]
+SEEDS = range(8)
+
+
+def trace_hash(controller, params):
+    digest = hashlib.sha1()
+    robo_vac_class = load_controller(controller)
+    for level, spec in GAMES:
+        for seed in SEEDS:
+            room_rng, agent_rng = episode_rngs(level, seed)
+            layout = make_generator(spec)(room_rng) if spec else None
+            room = Room(level, layout, room_rng)
+            robo_vac = make_robo_vac(robo_vac_class, room.get_room_config(),
+                                     agent_rng, dict(params))
+            sim = Simulator(room, robo_vac)
+            dirs = bytearray()
+            while not sim.is_done():
+                sim.step()
+                dirs.append(sim.last_dir & 0xFF)
+            digest.update(bytes(dirs) + b"|")
+    return digest.hexdigest()
+
+
+@pytest.mark.parametrize("key", list(TRACES),
+                         ids=lambda key: " ".join([key[0], *map(str, key[1])]))
+def test_trace(key):
+    assert trace_hash(*key) == TRACES[key]
+
+
+if __name__ == "__main__":
+    for key in TRACES:
+        key_repr = repr(key).replace("'", '"')
+        print(f'    {key_repr}: "{trace_hash(*key)}",')
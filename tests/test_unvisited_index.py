@@ -0,0 +1,45 @@
+"""
+    UnvisitedIndex answers like a scan over every unvisited tile
+"""
+
+import random
+
+import pytest
+
+from UnvisitedIndex import UnvisitedIndex
+
+
+def scan(unvisited, pos):
+    # the O(N) heuristic the index replaced
+    return min((abs(pos[0] - x) + abs(pos[1] - y) for x, y in unvisited),
+               default=float("inf"))
+
+
+@pytest.mark.parametrize("width, height", [(1, 1), (13, 12), (40, 7), (40, 40)])
+def test_distance_matches_scan(width, height):
+    rng = random.Random(f"{width}x{height}")
+    index = UnvisitedIndex(width, height)
+    index.set_rows([(1 << width) - 1] * height)
+    unvisited = {(x, y) for x in range(width) for y in range(height)}
+    order = sorted(unvisited)
+    rng.shuffle(order)
+    for tile in order:
+        pos = (rng.randrange(width), rng.randrange(height))
+        distance, nearest = index.nearest(pos)
+        assert distance == scan(unvisited, pos)
+        assert nearest in unvisited
+        index.discard(tile)
+        unvisited.discard(tile)
+        assert len(index) == len(unvisited)
+        assert tile not in index
+    assert index.nearest((0, 0)) == (float("inf"), None)
+
+
+def test_iter_and_choice():
+    rng = random.Random(0)
+    index = UnvisitedIndex(9, 5)
+    tiles = {(rng.randrange(9), rng.randrange(5)) for _ in range(20)}
+    for tile in tiles:
+        index.add(tile)
+    assert set(index) == tiles
+    assert all(index.choice(rng) in tiles for _ in range(50))